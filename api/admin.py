@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import OutboxMessage
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ("id", "channel", "status", "attempts", "next_attempt_at", "created_at")
+    list_filter = ("status", "channel")
+    readonly_fields = ("created_at", "sent_at")
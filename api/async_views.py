@@ -0,0 +1,192 @@
+# api/async_views.py
+import asyncio
+import hashlib
+import json
+import logging
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import ValidationError
+
+from realestate_app.catalog import catalog_cache, catalog_version
+from realestate_app.models import Property
+from .filters import filter_properties
+from .notifications import enqueue_inquiry_notifications
+from .outbox import deliver_now
+from .serializers import InquirySerializer, PropertyCardSerializer, PropertySerializer
+from .throttling import get_inquiry_guard
+
+# ----------------------------------------
+# NATIVE ASYNC ENDPOINTS (ASGI MODE)
+# ----------------------------------------
+# Twins of the busiest DRF endpoints for the ASGI serving mode
+# (gunicorn.conf.py, SERVER_MODE=asgi): while one waits on the database,
+# the cache or Twilio, the worker serves other requests. Under WSGI they
+# still work, one event loop per request. Responses match the DRF views;
+# ranked ?search= and ?fields= stay on /api/properties/.
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# fast-path deliveries still in flight (the loop keeps only weak references)
+background = set()
+
+
+def parse_body(request):
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+    return request.POST.dict()
+
+
+def throttled_response(wait):
+    wait = math.ceil(wait)
+    response = JsonResponse(
+        {"detail": f"Request was throttled. Expected available in {wait} seconds."}, status=429
+    )
+    response["Retry-After"] = str(wait)
+    return response
+
+
+# ----------------------------------------
+# INQUIRY CREATE
+# ----------------------------------------
+def save_inquiry(serializer):
+    # the inquiry and its notifications commit (or roll back) together
+    with transaction.atomic():
+        inquiry = serializer.save()
+        messages = enqueue_inquiry_notifications(inquiry)
+    return serializer.data, messages
+
+
+async def deliver_quietly(messages):
+    try:
+        await deliver_now(messages, settings.OUTBOX_FAST_PATH_TIMEOUT)
+    except Exception:
+        # the rows are still in the outbox; the worker takes them over
+        logger.exception("Fast-path delivery failed")
+
+
+def deliver_in_background(messages):
+    task = asyncio.get_running_loop().create_task(deliver_quietly(messages))
+    background.add(task)
+    task.add_done_callback(background.discard)
+
+
+@csrf_exempt
+@require_POST
+async def inquiry_create(request):
+    data = parse_body(request)
+    if not isinstance(data, dict):
+        return JsonResponse({"detail": "JSON parse error."}, status=400)
+
+    admission = await sync_to_async(get_inquiry_guard().admit)(
+        request, data.get("phone"), data.get("message")
+    )
+    if admission.duplicate:
+        if admission.original is None:
+            return JsonResponse({"detail": "This inquiry is already being submitted."}, status=409)
+        return JsonResponse(admission.original, status=201)
+    if admission.throttled:
+        return throttled_response(admission.wait)
+
+    try:
+        serializer = InquirySerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+        payload, messages = await sync_to_async(save_inquiry)(serializer)
+        await sync_to_async(admission.remember)(payload)
+    finally:
+        await sync_to_async(admission.release)()
+
+    # Deliver right after responding rather than on the worker's next poll;
+    # anything that fails or times out stays in the outbox for the worker.
+    # Only under ASGI: with WSGI the event loop ends with the request.
+    if settings.OUTBOX_FAST_PATH and isinstance(request, ASGIRequest):
+        deliver_in_background(messages)
+    return JsonResponse(payload, status=201)
+
+
+# ----------------------------------------
+# PROPERTY READS (catalog-versioned cache, as CatalogCacheMixin)
+# ----------------------------------------
+async def cached(request, action, build):
+    cache = catalog_cache()
+    version = await sync_to_async(catalog_version)()
+    digest = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    key = f"api:async-properties:{action}:{version}:{digest}"
+
+    data = await cache.aget(key)
+    if data is None:
+        data = await build()
+        if data is not None:
+            await cache.aset(key, data, getattr(settings, "CATALOG_CACHE_TIMEOUT", 300))
+    return data
+
+
+@require_GET
+async def property_detail(request, pk):
+    async def build():
+        prop = await Property.objects.with_images().filter(pk=pk).afirst()
+        if prop is None:
+            return None
+        return PropertySerializer(prop, context={"request": request}).data
+
+    data = await cached(request, "retrieve", build)
+    if data is None:
+        return JsonResponse({"detail": "Not found."}, status=404)
+    return JsonResponse(data)
+
+
+@require_GET
+async def property_list(request):
+    # newest first, keyset-paged: ?after=<id of the last row seen>
+    params = request.GET
+    errors = {}
+    try:
+        page_size = min(max(int(params.get("page_size", PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        errors["page_size"] = ["Enter a whole number."]
+    try:
+        after = int(params["after"]) if params.get("after") else None
+    except ValueError:
+        errors["after"] = ["Enter a whole number."]
+    if errors:
+        return JsonResponse(errors, status=400)
+
+    serializer_class = PropertyCardSerializer if params.get("view") == "compact" else PropertySerializer
+    context = {"request": request}
+
+    async def build():
+        queryset = filter_properties(Property.objects.all(), params)
+        queryset = serializer_class(context=context).prepare_queryset(queryset)
+        if after is not None:
+            queryset = queryset.filter(pk__lt=after)
+        rows = [prop async for prop in queryset.order_by("-id")[:page_size + 1]]
+
+        next_link = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            query = params.copy()
+            query["after"] = rows[-1].pk
+            next_link = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+        return {
+            "next": next_link,
+            "results": serializer_class(rows, many=True, context=context).data,
+        }
+
+    try:
+        data = await cached(request, "list", build)
+    except ValidationError as e:
+        return JsonResponse(e.detail, status=400)
+    return JsonResponse(data)
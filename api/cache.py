@@ -0,0 +1,40 @@
+# api/cache.py
+import hashlib
+
+from django.conf import settings
+from rest_framework.response import Response
+
+from realestate_app.catalog import catalog_cache, catalog_version
+
+
+# ----------------------------------------
+# VERSIONED RESPONSE CACHE
+# ----------------------------------------
+class CatalogCacheMixin:
+    # Caches list/retrieve payloads per URL under the current catalog
+    # version; any Property/PropertyImage write bumps the version.
+
+    def catalog_cache_key(self, request):
+        # absolute URI: pagination links embed the host
+        url = request.build_absolute_uri()
+        digest = hashlib.md5(url.encode()).hexdigest()
+        return f"api:{self.basename}:{self.action}:{catalog_version()}:{digest}"
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = catalog_cache()
+        key = self.catalog_cache_key(request)
+
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, getattr(settings, "CATALOG_CACHE_TIMEOUT", 300))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,86 @@
+# api/conditional.py
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from realestate_app.catalog import catalog_cache, catalog_version
+
+
+# ----------------------------------------
+# ETAG / LAST-MODIFIED CONDITIONAL GETS
+# ----------------------------------------
+class ConditionalGetMixin:
+    # list:     ETag from (URL, max(updated_at), row count) of the filtered set
+    # retrieve: ETag + Last-Modified from the row's updated_at
+    #
+    # Validators are memoised under the catalog version, so an unchanged
+    # poll usually costs no query at all, and at most one aggregate.
+    # The list sends no Last-Modified: a delete lowers the count without
+    # moving max(updated_at), which only the ETag notices.
+
+    def list_validators(self, request):
+        stats = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            last_modified=Max("updated_at"), count=Count("id")
+        )
+        last_modified = stats["last_modified"]
+        stamp = last_modified.isoformat() if last_modified else ""
+        return self.make_etag(request, f"{stamp}:{stats['count']}"), None
+
+    def retrieve_validators(self, request, pk):
+        try:
+            last_modified = self.get_queryset().model.objects.filter(pk=pk).values_list(
+                "updated_at", flat=True
+            ).first()
+        except (TypeError, ValueError):
+            last_modified = None
+        if last_modified is None:
+            return None, None
+        # HTTP dates have whole-second precision; the ETag keeps the rest
+        return self.make_etag(request, last_modified.isoformat()), int(last_modified.timestamp())
+
+    def make_etag(self, request, state):
+        digest = hashlib.md5(f"{request.build_absolute_uri()}|{state}".encode()).hexdigest()
+        return quote_etag(digest)
+
+    def get_validators(self, request, compute):
+        cache = catalog_cache()
+        digest = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f"api:{self.basename}:validators:{catalog_version()}:{digest}"
+        validators = cache.get(key)
+        if validators is None:
+            validators = compute()
+            cache.set(key, validators, getattr(settings, "CATALOG_CACHE_TIMEOUT", 300))
+        return validators
+
+    def conditional_response(self, handler, request, compute, *args, **kwargs):
+        etag, last_modified = self.get_validators(request, compute)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        else:
+            response = not_modified
+
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, lambda: self.list_validators(request), *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        return self.conditional_response(
+            super().retrieve, request, lambda: self.retrieve_validators(request, pk), *args, **kwargs
+        )
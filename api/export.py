@@ -0,0 +1,102 @@
+# api/export.py
+import csv
+import json
+from datetime import date, datetime
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+
+from .filters import parse_since
+
+EXPORT_CHUNK_SIZE = 2000
+
+INQUIRY_EXPORT_FIELDS = ["id", "name", "phone", "email", "location", "message", "created_at"]
+
+PROPERTY_EXPORT_FIELDS = [
+    "id", "title", "description", "price", "location", "property_type",
+    "bedrooms", "bathrooms", "plot_area", "carpet_area", "super_builtup_area",
+    "date_posted", "updated_at", "sold_out",
+]
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class Echo:
+    # csv.writer target that hands each line back instead of buffering it
+    def write(self, value):
+        return value
+
+
+# spreadsheets run cells starting with these as formulas; inquiry text
+# comes from the public form (CSV injection)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_lines(queryset, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield writer.writerow([csv_value(value) for value in row])
+
+
+def ndjson_lines(queryset, fields):
+    for row in queryset.values(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def filter_range(queryset, params, field):
+    # ?since= / ?until= (date or ISO datetime) on the export's timestamp
+    lookups, errors = {}, {}
+    for param, lookup in (("since", "gte"), ("until", "lt")):
+        value = params.get(param)
+        if not value:
+            continue
+        try:
+            lookups[f"{field}__{lookup}"] = parse_since(value)
+        except ValueError as e:
+            errors[param] = [str(e)]
+    if errors:
+        raise ValidationError(errors)
+    return queryset.filter(**lookups)
+
+
+# ----------------------------------------
+# STREAMING RESPONSE (constant memory)
+# ----------------------------------------
+# Under ASGI (SERVER_MODE=asgi) Django reads a sync iterator to the end
+# before sending anything, so the lines are handed over as an async
+# iterator instead: EXPORT_CHUNK_SIZE lines per trip to the sync thread
+# that holds the database cursor.
+
+def take(lines, size):
+    return "".join(islice(lines, size))
+
+
+async def async_chunks(lines):
+    while chunk := await sync_to_async(take)(lines, EXPORT_CHUNK_SIZE):
+        yield chunk
+
+
+def stream_export(request, queryset, fields, fmt, filename):
+    lines = csv_lines(queryset, fields) if fmt == "csv" else ndjson_lines(queryset, fields)
+    # a DRF Request wraps the handler's HttpRequest
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        lines = async_chunks(lines)
+    response = StreamingHttpResponse(lines, content_type=CONTENT_TYPES[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return response
@@ -0,0 +1,60 @@
+# api/facets.py
+from django.db.models import Count, Q
+
+from realestate_app.models import Property
+
+# (key, min inclusive, max exclusive); None is open-ended
+PRICE_BUCKETS = [
+    ("under_25l", None, 2_500_000),
+    ("25l_50l", 2_500_000, 5_000_000),
+    ("50l_1cr", 5_000_000, 10_000_000),
+    ("1cr_2cr", 10_000_000, 20_000_000),
+    ("2cr_5cr", 20_000_000, 50_000_000),
+    ("over_5cr", 50_000_000, None),
+]
+
+# bedroom counts shown individually; the last one is "N or more"
+BEDROOM_BUCKETS = [1, 2, 3, 4, 5]
+
+
+def price_q(low, high):
+    q = Q()
+    if low is not None:
+        q &= Q(price__gte=low)
+    if high is not None:
+        q &= Q(price__lt=high)
+    return q
+
+
+def facet_aggregates():
+    # alias -> Count(filter=...); one conditional aggregate per facet value
+    aggregates = {"total": Count("id")}
+    for value, _ in Property.PROPERTY_TYPES:
+        aggregates[f"type__{value}"] = Count("id", filter=Q(property_type=value))
+    for key, low, high in PRICE_BUCKETS:
+        aggregates[f"price__{key}"] = Count("id", filter=price_q(low, high))
+    for beds in BEDROOM_BUCKETS[:-1]:
+        aggregates[f"beds__{beds}"] = Count("id", filter=Q(bedrooms=beds))
+    aggregates[f"beds__{BEDROOM_BUCKETS[-1]}+"] = Count("id", filter=Q(bedrooms__gte=BEDROOM_BUCKETS[-1]))
+    aggregates["sold__available"] = Count("id", filter=Q(sold_out=False))
+    aggregates["sold__sold"] = Count("id", filter=Q(sold_out=True))
+    return aggregates
+
+
+def facet_counts(queryset):
+    # every facet from a single pass over the filtered rows
+    row = queryset.order_by().aggregate(**facet_aggregates())
+
+    def group(prefix):
+        return {alias[len(prefix):]: count for alias, count in row.items() if alias.startswith(prefix)}
+
+    return {
+        "total": row["total"],
+        "property_type": group("type__"),
+        "price": [
+            {"key": key, "min": low, "max": high, "count": row[f"price__{key}"]}
+            for key, low, high in PRICE_BUCKETS
+        ],
+        "bedrooms": group("beds__"),
+        "availability": group("sold__"),
+    }
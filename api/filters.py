@@ -0,0 +1,196 @@
+# api/filters.py
+import math
+from datetime import datetime, time
+from decimal import Decimal, InvalidOperation
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from realestate_app.geo import within_bbox, within_radius
+from realestate_app.models import Property
+from realestate_app.search import search_properties
+
+
+# NaN/Infinity parse as numbers but are no use as bounds (and break the
+# database adapters), as are values past what the columns can hold
+MAX_DECIMAL = Decimal("1e15")
+MAX_INT = 2 ** 63 - 1
+
+
+def parse_decimal(value):
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        raise ValueError("Enter a number.")
+    if not number.is_finite() or abs(number) >= MAX_DECIMAL:
+        raise ValueError("Enter a finite number.")
+    return number
+
+
+def parse_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError("Enter a whole number.")
+    if abs(number) > MAX_INT:
+        raise ValueError("Enter a smaller whole number.")
+    return number
+
+
+def parse_float(value):
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError("Enter a number.")
+    if not math.isfinite(number):
+        raise ValueError("Enter a finite number.")
+    return number
+
+
+def parse_bool(value):
+    value = value.lower()
+    if value in ("1", "true", "yes"):
+        return True
+    if value in ("0", "false", "no"):
+        return False
+    raise ValueError("Enter true or false.")
+
+
+def parse_since(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError("Enter a date (YYYY-MM-DD) or ISO datetime.")
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_coordinates(value, count):
+    try:
+        numbers = [parse_float(part) for part in value.split(",")]
+    except ValueError:
+        numbers = []
+    if len(numbers) != count:
+        raise ValueError(f"Enter {count} comma-separated numbers.")
+    for lat in numbers[0::2]:
+        if not -90 <= lat <= 90:
+            raise ValueError("Latitude must be between -90 and 90.")
+    for lng in numbers[1::2]:
+        if not -180 <= lng <= 180:
+            raise ValueError("Longitude must be between -180 and 180.")
+    return numbers
+
+
+def parse_bbox(value):
+    # min_lat,min_lng,max_lat,max_lng
+    min_lat, min_lng, max_lat, max_lng = parse_coordinates(value, 4)
+    if min_lat > max_lat or min_lng > max_lng:
+        raise ValueError("Enter min_lat,min_lng,max_lat,max_lng (boxes across the antimeridian are not supported).")
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def parse_types(value):
+    valid = {choice for choice, _ in Property.PROPERTY_TYPES}
+    types = [t.strip() for t in value.split(",") if t.strip()]
+    unknown = [t for t in types if t not in valid]
+    if unknown:
+        raise ValueError(f"Unknown property type: {', '.join(unknown)}.")
+    return types
+
+
+# query param -> (ORM lookup, parser)
+PROPERTY_FILTERS = {
+    "type": ("property_type__in", parse_types),
+    "min_price": ("price__gte", parse_decimal),
+    "max_price": ("price__lte", parse_decimal),
+    "min_bedrooms": ("bedrooms__gte", parse_int),
+    "min_bathrooms": ("bathrooms__gte", parse_int),
+    "min_plot_area": ("plot_area__gte", parse_float),
+    "max_plot_area": ("plot_area__lte", parse_float),
+    "min_carpet_area": ("carpet_area__gte", parse_float),
+    "max_carpet_area": ("carpet_area__lte", parse_float),
+    "min_super_builtup_area": ("super_builtup_area__gte", parse_float),
+    "max_super_builtup_area": ("super_builtup_area__lte", parse_float),
+    "posted_since": ("date_posted__gte", parse_since),
+}
+
+
+def filter_properties(queryset, params):
+    lookups = {}
+    errors = {}
+
+    for param, (lookup, parse) in PROPERTY_FILTERS.items():
+        value = params.get(param)
+        if value in (None, ""):
+            continue
+        try:
+            lookups[lookup] = parse(value)
+        except ValueError as e:
+            errors[param] = [str(e)]
+
+    available = params.get("available")
+    if available not in (None, ""):
+        try:
+            lookups["sold_out"] = not parse_bool(available)
+        except ValueError as e:
+            errors["available"] = [str(e)]
+
+    geo = parse_geo(params, errors)
+
+    if errors:
+        raise ValidationError(errors)
+
+    queryset = queryset.filter(**lookups)
+    if "bbox" in geo:
+        queryset = within_bbox(queryset, *geo["bbox"])
+    if "near" in geo:
+        queryset = within_radius(queryset, *geo["near"], geo["radius_km"])
+    return queryset
+
+
+def parse_geo(params, errors):
+    # ?bbox=min_lat,min_lng,max_lat,max_lng  ?near=lat,lng&radius_km=5
+    geo = {}
+    bbox = params.get("bbox")
+    if bbox not in (None, ""):
+        try:
+            geo["bbox"] = parse_bbox(bbox)
+        except ValueError as e:
+            errors["bbox"] = [str(e)]
+
+    near, radius = params.get("near"), params.get("radius_km")
+    if near in (None, "") and radius in (None, ""):
+        return geo
+    if near in (None, ""):
+        errors["near"] = ["Required with radius_km."]
+        return geo
+    try:
+        geo["near"] = parse_coordinates(near, 2)
+    except ValueError as e:
+        errors["near"] = [str(e)]
+    try:
+        geo["radius_km"] = parse_float(radius or "")
+        if not 0 < geo["radius_km"] <= 500:
+            raise ValueError("Enter a radius between 0 and 500 km.")
+    except ValueError as e:
+        errors["radius_km"] = [str(e)]
+    return geo
+
+
+# ----------------------------------------
+# DRF FILTER BACKEND
+# ----------------------------------------
+class PropertyFilterBackend(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        return filter_properties(queryset, request.query_params)
+
+
+class PropertySearchBackend(BaseFilterBackend):
+    # ?search= ranks results by relevance (see realestate_app/search.py)
+    def filter_queryset(self, request, queryset, view):
+        return search_properties(queryset, request.query_params.get("search"))
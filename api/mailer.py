@@ -0,0 +1,82 @@
+# api/mailer.py
+import logging
+import smtplib
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from realestate_app.metrics import notification
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------------------
+# EMAIL DISPATCHER (one SMTP session, many messages)
+# ----------------------------------------
+class EmailDispatcher:
+    # Keeps a single connection open across outbox rounds instead of a
+    # STARTTLS handshake per inquiry. Not thread-safe: the worker hands it
+    # one batch at a time.
+
+    def __init__(self, idle_timeout=None):
+        self.idle_timeout = idle_timeout if idle_timeout is not None else settings.EMAIL_IDLE_TIMEOUT
+        self.conn = None
+        self.last_used = 0
+
+    def connection(self):
+        # SMTP servers drop idle sessions; reconnect rather than fail a send
+        if self.conn is not None and time.monotonic() - self.last_used > self.idle_timeout:
+            self.close()
+        if self.conn is None:
+            self.conn = get_connection(fail_silently=False)
+            self.conn.open()
+        self.last_used = time.monotonic()
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+
+    def build(self, subject, body):
+        return EmailMessage(
+            subject=subject,
+            body=body,
+            from_email=settings.EMAIL_HOST_USER,
+            to=[settings.ADMIN_NOTIFICATION_EMAIL],
+        )
+
+    def send(self, message):
+        with notification("email"):
+            try:
+                self.connection().send_messages([message])
+            except smtplib.SMTPServerDisconnected:
+                # stale session: one retry on a fresh connection
+                self.close()
+                self.connection().send_messages([message])
+
+    def send_each(self, payloads):
+        # one error (or None) per payload, in order
+        errors = []
+        for payload in payloads:
+            try:
+                self.send(self.build(payload["subject"], payload["body"]))
+                errors.append(None)
+            except Exception as e:
+                self.close()
+                errors.append(f"{type(e).__name__}: {e}")
+        return errors
+
+    def send_digest(self, payloads):
+        subject = f"{len(payloads)} new inquiries"
+        body = "\n-----\n\n".join(payload["body"] for payload in payloads)
+        try:
+            self.send(self.build(subject, body))
+            return None
+        except Exception as e:
+            self.close()
+            return f"{type(e).__name__}: {e}"
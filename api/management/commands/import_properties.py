@@ -0,0 +1,157 @@
+import csv
+import json
+import os
+from collections import Counter
+from itertools import islice
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from api.serializers import PropertyCreateUpdateSerializer
+from realestate_app import stats
+from realestate_app.catalog import bump_catalog_version
+from realestate_app.models import Property
+from realestate_app.search import get_search_backend
+from realestate_app.uploads import ImageUploadError, upload_property_images
+
+
+def read_rows(path, fmt):
+    # yields (row number, row); nothing is held beyond the current row
+    # except for plain JSON arrays, which have to be parsed whole. A row is
+    # whatever the line held (import_batch reports non-objects), or a
+    # ValueError for an NDJSON line that is not JSON.
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if fmt == "csv":
+            for number, row in enumerate(csv.DictReader(f), start=2):
+                yield number, row
+        elif fmt == "ndjson":
+            for number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield number, json.loads(line)
+                    except ValueError as e:
+                        yield number, ValueError(f"Invalid JSON: {e}")
+        else:
+            try:
+                rows = json.load(f)
+            except ValueError as e:
+                raise CommandError(f"{path} is not valid JSON: {e}")
+            if not isinstance(rows, list):
+                raise CommandError("JSON input must be an array of objects.")
+            for number, row in enumerate(rows, start=1):
+                yield number, row
+
+
+def clean_row(row):
+    # CSV cannot say "null": an empty cell means "not provided"
+    return {key: value for key, value in row.items() if key and value not in ("", None)}
+
+
+class Command(BaseCommand):
+    help = "Bulk-import listings from CSV, JSON or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "json", "ndjson"],
+                            help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Rows validated and inserted per transaction.")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Validate and report only; write nothing.")
+        parser.add_argument("--report", help="Write per-row errors to this CSV file.")
+        parser.add_argument("--images-column", default="images",
+                            help="Column with '|'-separated local image paths.")
+        parser.add_argument("--images-root", default=".",
+                            help="Directory image paths are relative to.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or os.path.splitext(path)[1].lstrip(".").lower()
+        if fmt == "jsonl":
+            fmt = "ndjson"
+        if fmt not in ("csv", "json", "ndjson"):
+            raise CommandError(f"Cannot tell the format of {path}; pass --format.")
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist.")
+
+        self.options = options
+        self.errors = []
+        self.validator = PropertyCreateUpdateSerializer()
+        created = 0
+
+        rows = read_rows(path, fmt)
+        while True:
+            batch = list(islice(rows, max(options["batch_size"], 1)))
+            if not batch:
+                break
+            created += self.import_batch(batch)
+
+        if created and not options["dry_run"]:
+            bump_catalog_version()
+
+        if options["report"]:
+            with open(options["report"], "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["row", "errors"])
+                for number, errors in self.errors:
+                    writer.writerow([number, json.dumps(errors)])
+
+        verb = "would be created" if options["dry_run"] else "created"
+        self.stdout.write(f"{created} properties {verb}, {len(self.errors)} rows with errors")
+
+    def import_batch(self, batch):
+        images_column = self.options["images_column"]
+        valid = []
+
+        for number, row in batch:
+            if isinstance(row, ValueError):
+                self.errors.append((number, {"non_field_errors": [str(row)]}))
+                continue
+            if not isinstance(row, dict):
+                self.errors.append((number, {"non_field_errors": ["Expected an object."]}))
+                continue
+            row = clean_row(row)
+            image_paths = [p.strip() for p in str(row.pop(images_column, "")).split("|") if p.strip()]
+            try:
+                # one serializer reused for every row, as ListSerializer does
+                data = self.validator.run_validation(row)
+            except ValidationError as e:
+                self.errors.append((number, e.detail))
+            else:
+                prop = Property(**data)
+                prop.sync_geohash()  # bulk_create skips save()
+                valid.append((number, prop, image_paths))
+
+        if self.options["dry_run"] or not valid:
+            return len(valid)
+
+        with transaction.atomic():
+            created = Property.objects.bulk_create([prop for _, prop, _ in valid])
+            # bulk_create skips post_save: index and count the batch in one go
+            get_search_backend().index([prop.pk for prop in created])
+            deltas = Counter()
+            for prop in created:
+                deltas.update(stats.listing_delta(prop.date_posted, prop.sold_at))
+            stats.apply(deltas)
+
+        for number, prop, image_paths in valid:
+            if image_paths:
+                self.attach_images(number, prop, image_paths)
+
+        return len(created)
+
+    def attach_images(self, number, prop, image_paths):
+        root = self.options["images_root"]
+        handles = []
+        try:
+            for image_path in image_paths:
+                handles.append(File(open(os.path.join(root, image_path), "rb"), name=os.path.basename(image_path)))
+            upload_property_images(prop, handles)
+        except (OSError, ImageUploadError) as e:
+            # the listing stays; only its photos are reported
+            self.errors.append((number, {"images": [str(e)]}))
+        finally:
+            for handle in handles:
+                handle.close()
@@ -0,0 +1,40 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.mailer import EmailDispatcher
+from api.outbox import run_once
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notifications from the outbox (email, WhatsApp)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=settings.OUTBOX_CONCURRENCY,
+                            help="Deliveries in flight at once.")
+        parser.add_argument("--batch-size", type=int, default=50,
+                            help="Messages claimed per round.")
+        parser.add_argument("--poll-interval", type=float, default=2.0,
+                            help="Seconds to sleep when nothing was sent.")
+        parser.add_argument("--once", action="store_true",
+                            help="Drain what is due now and exit.")
+
+    def handle(self, *args, **options):
+        concurrency = max(options["concurrency"], 1)
+        batch_size = max(options["batch_size"], 1)
+        dispatcher = EmailDispatcher()
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                while True:
+                    sent, failed = run_once(executor, dispatcher, batch_size)
+                    if sent or failed:
+                        self.stdout.write(f"outbox: {sent} sent, {failed} failed")
+                        continue
+                    if options["once"]:
+                        return
+                    time.sleep(options["poll_interval"])
+        finally:
+            dispatcher.close()
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-18 09:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_alter_inquiry_email_alter_inquiry_location'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inquiry',
+            index=models.Index(fields=['-created_at', 'id'], name='inquiry_created_id_idx'),
+        ),
+    ]
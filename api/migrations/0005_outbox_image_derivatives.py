@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 09:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='channel',
+            field=models.CharField(choices=[('email', 'Email'), ('whatsapp', 'WhatsApp'), ('image_derivatives', 'Image derivatives')], max_length=20),
+        ),
+    ]
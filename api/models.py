@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 class Inquiry(models.Model):
     name = models.CharField(max_length=120)
@@ -8,5 +9,57 @@ class Inquiry(models.Model):
     message = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="inquiry_created_id_idx"),
+        ]
+
     def __str__(self):
         return f"Inquiry from {self.name} - {self.phone}"
+
+
+class OutboxMessage(models.Model):
+    # Notifications (and other deferred work, e.g. image derivatives) are
+    # written here in the same transaction as the row that caused them and
+    # delivered by `manage.py process_outbox`.
+
+    PENDING = "pending"
+    PROCESSING = "processing"
+    SENT = "sent"
+    DEAD = "dead"
+
+    STATUSES = [
+        (PENDING, "Pending"),
+        (PROCESSING, "Processing"),
+        (SENT, "Sent"),
+        (DEAD, "Dead"),
+    ]
+
+    CHANNELS = [
+        ("email", "Email"),
+        ("whatsapp", "WhatsApp"),
+        ("image_derivatives", "Image derivatives"),
+    ]
+
+    channel = models.CharField(max_length=20, choices=CHANNELS)
+    inquiry = models.ForeignKey(
+        Inquiry, null=True, blank=True, on_delete=models.SET_NULL, related_name="notifications"
+    )
+    payload = models.JSONField(default=dict)
+
+    status = models.CharField(max_length=20, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_status_next_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} #{self.pk} ({self.status})"
@@ -0,0 +1,80 @@
+# api/notifications.py
+from django.conf import settings
+
+from realestate_app.derivatives import run_derivative_job
+
+from .models import OutboxMessage
+from .whatsapp import get_async_whatsapp_client, get_whatsapp_client
+
+
+# ----------------------------------------
+# MESSAGE RENDERING
+# ----------------------------------------
+def inquiry_details(inquiry):
+    return (
+        f"Name: {inquiry.name}\n"
+        f"Phone: {inquiry.phone}\n"
+        f"Email: {inquiry.email}\n"
+        f"Location: {inquiry.location}\n"
+        f"Message: {inquiry.message}"
+    )
+
+
+def enqueue_inquiry_notifications(inquiry):
+    # call inside the transaction that saved the inquiry
+    details = inquiry_details(inquiry)
+    return OutboxMessage.objects.bulk_create([
+        OutboxMessage(
+            channel="email",
+            inquiry=inquiry,
+            payload={
+                "subject": f"New Inquiry from {inquiry.name}",
+                "body": details + "\n",
+            },
+        ),
+        OutboxMessage(
+            channel="whatsapp",
+            inquiry=inquiry,
+            payload={"body": f"New Inquiry:\n{details}"},
+        ),
+    ])
+
+
+def enqueue_property_inquiry_notification(inquiry, prop):
+    # property page form: WhatsApp to the listing agent
+    return OutboxMessage.objects.create(
+        channel="whatsapp",
+        inquiry=inquiry,
+        payload={
+            "body": (
+                f"New Inquiry!\nName: {inquiry.name}\nPhone: {inquiry.phone}\n"
+                f"Property: {prop.title}\nLocation: {prop.location}"
+            ),
+            "to": f"whatsapp:{settings.AGENT_WHATSAPP_NUMBER}",
+        },
+    )
+
+
+# ----------------------------------------
+# DELIVERY (raise on failure so the outbox retries)
+# ----------------------------------------
+# Email is not here: api/mailer.py sends it in batches over one connection.
+
+def deliver_whatsapp(payload):
+    get_whatsapp_client().send(payload["body"], to=payload.get("to"))
+
+
+SENDERS = {
+    "whatsapp": deliver_whatsapp,
+    "image_derivatives": run_derivative_job,
+}
+
+
+# async views try these channels straight away (outbox.deliver_now)
+async def deliver_whatsapp_async(payload):
+    await get_async_whatsapp_client().send(payload["body"], to=payload.get("to"))
+
+
+ASYNC_SENDERS = {
+    "whatsapp": deliver_whatsapp_async,
+}
@@ -0,0 +1,222 @@
+# api/outbox.py
+import asyncio
+import logging
+import random
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Min, Q
+from django.utils import timezone
+
+from realestate_app.metrics import notification
+from .models import OutboxMessage
+from .notifications import ASYNC_SENDERS, SENDERS
+from .whatsapp import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+
+def backoff(attempts):
+    # 30s, 60s, 120s ... capped, with +/-10% jitter so retries spread out
+    delay = min(settings.OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1), settings.OUTBOX_BACKOFF_MAX)
+    return timedelta(seconds=delay * random.uniform(0.9, 1.1))
+
+
+# ----------------------------------------
+# CLAIMING
+# ----------------------------------------
+def claim_batch(limit, channels=None, exclude_channels=None):
+    # Rows move to PROCESSING with a lease; a worker that dies mid-batch
+    # leaves rows that become claimable again once the lease runs out.
+    now = timezone.now()
+    due = Q(status=OutboxMessage.PENDING, next_attempt_at__lte=now) | Q(
+        status=OutboxMessage.PROCESSING, locked_until__lt=now
+    )
+    queryset = OutboxMessage.objects.filter(due)
+    if channels:
+        queryset = queryset.filter(channel__in=channels)
+    if exclude_channels:
+        queryset = queryset.exclude(channel__in=exclude_channels)
+
+    with transaction.atomic():
+        ids = list(
+            queryset.order_by("next_attempt_at")
+            .select_for_update(skip_locked=True)
+            .values_list("pk", flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        OutboxMessage.objects.filter(pk__in=ids).filter(due).update(
+            status=OutboxMessage.PROCESSING,
+            locked_until=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+        )
+
+    return list(OutboxMessage.objects.filter(pk__in=ids, status=OutboxMessage.PROCESSING))
+
+
+def claim_messages(ids):
+    # claim specific rows for the async fast path; any a worker already
+    # holds are left alone (they carry a different lease)
+    locked_until = timezone.now() + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+    OutboxMessage.objects.filter(pk__in=ids, status=OutboxMessage.PENDING).update(
+        status=OutboxMessage.PROCESSING, locked_until=locked_until
+    )
+    return list(OutboxMessage.objects.filter(
+        pk__in=ids, status=OutboxMessage.PROCESSING, locked_until=locked_until
+    ))
+
+
+# ----------------------------------------
+# OUTCOMES
+# ----------------------------------------
+def mark_sent(messages):
+    OutboxMessage.objects.filter(pk__in=[m.pk for m in messages]).update(
+        status=OutboxMessage.SENT,
+        attempts=F("attempts") + 1,
+        sent_at=timezone.now(),
+        locked_until=None,
+        last_error="",
+    )
+
+
+def mark_failed(message, error):
+    attempts = message.attempts + 1
+    message.attempts = attempts
+    message.last_error = error[:2000]
+    message.locked_until = None
+    if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        message.status = OutboxMessage.DEAD
+        logger.error("Outbox message %s dead-lettered after %s attempts: %s", message.pk, attempts, error)
+    else:
+        message.status = OutboxMessage.PENDING
+        message.next_attempt_at = timezone.now() + backoff(attempts)
+    message.save(update_fields=["attempts", "last_error", "locked_until", "status", "next_attempt_at"])
+
+
+# ----------------------------------------
+# DELIVERY
+# ----------------------------------------
+def mark_deferred(message, seconds):
+    # provider is known to be down: retry later without spending an attempt
+    OutboxMessage.objects.filter(pk=message.pk).update(
+        status=OutboxMessage.PENDING,
+        locked_until=None,
+        next_attempt_at=timezone.now() + timedelta(seconds=seconds),
+    )
+
+
+DEFERRED = "deferred"
+
+
+def deliver(message):
+    # runs on a pool thread; outcomes are recorded by the caller
+    try:
+        with notification(message.channel):
+            SENDERS[message.channel](message.payload)
+        return None
+    except CircuitOpenError:
+        return DEFERRED
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    finally:
+        # handlers that touch the ORM open a connection on this thread
+        connections.close_all()
+
+
+def settle(results):
+    sent = []
+    for message, error in results:
+        if error is None:
+            sent.append(message)
+        elif error is DEFERRED:
+            mark_deferred(message, settings.NOTIFY_BREAKER_RESET)
+        else:
+            mark_failed(message, error)
+    if sent:
+        mark_sent(sent)
+    return len(sent), len(results) - len(sent)
+
+
+def process_batch(messages, executor, dispatcher):
+    # emails share the dispatcher's SMTP session as one pool task;
+    # everything else is delivered concurrently alongside it
+    emails = [m for m in messages if m.channel == "email"]
+    others = [m for m in messages if m.channel != "email"]
+
+    email_errors = None
+    if emails:
+        email_errors = executor.submit(dispatcher.send_each, [m.payload for m in emails])
+
+    results = list(zip(others, executor.map(deliver, others)))
+    if email_errors is not None:
+        results += list(zip(emails, email_errors.result()))
+    return settle(results)
+
+
+# ----------------------------------------
+# ASYNC FAST PATH
+# ----------------------------------------
+# Async views deliver fresh messages themselves instead of waiting for the
+# worker's next poll. The rows stay in the outbox: whatever fails or times
+# out here is settled exactly as the worker would, and the worker retries.
+
+async def deliver_async(message, timeout):
+    try:
+        with notification(message.channel):
+            await asyncio.wait_for(ASYNC_SENDERS[message.channel](message.payload), timeout)
+        return None
+    except (CircuitOpenError, asyncio.TimeoutError):
+        # down, or outcome unknown: retry later without spending an attempt
+        return DEFERRED
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+async def deliver_now(messages, timeout):
+    ids = [m.pk for m in messages if m.channel in ASYNC_SENDERS]
+    if not ids:
+        return 0, 0
+    claimed = await sync_to_async(claim_messages)(ids)
+    errors = await asyncio.gather(*(deliver_async(m, timeout) for m in claimed))
+    return await sync_to_async(settle)(list(zip(claimed, errors)))
+
+
+# ----------------------------------------
+# DIGEST MODE
+# ----------------------------------------
+def digest_due(window):
+    # wait until the oldest due email has waited a full window, then send
+    # everything pending as one message
+    now = timezone.now()
+    oldest = OutboxMessage.objects.filter(
+        channel="email", status=OutboxMessage.PENDING, next_attempt_at__lte=now
+    ).aggregate(oldest=Min("created_at"))["oldest"]
+    return oldest is not None and oldest <= now - timedelta(seconds=window)
+
+
+def process_digest(dispatcher, window, limit):
+    if not digest_due(window):
+        return 0, 0
+    messages = claim_batch(limit, channels=["email"])
+    if not messages:
+        return 0, 0
+    error = dispatcher.send_digest([m.payload for m in messages])
+    return settle([(message, error) for message in messages])
+
+
+def run_once(executor, dispatcher, batch_size):
+    window = settings.INQUIRY_EMAIL_DIGEST_WINDOW
+    if window:
+        sent, failed = process_digest(dispatcher, window, settings.INQUIRY_EMAIL_DIGEST_MAX)
+        messages = claim_batch(batch_size, exclude_channels=["email"])
+    else:
+        sent, failed = 0, 0
+        messages = claim_batch(batch_size)
+
+    if messages:
+        batch_sent, batch_failed = process_batch(messages, executor, dispatcher)
+        sent += batch_sent
+        failed += batch_failed
+    return sent, failed
@@ -0,0 +1,48 @@
+# api/pagination.py
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+# ----------------------------------------
+# KEYSET (CURSOR) PAGINATION
+# ----------------------------------------
+class CountedCursorPagination(CursorPagination):
+    # ?page_size=N is capped at max_page_size.
+    # ?count=true adds the total; off by default since it is the only part
+    # of a page whose cost grows with the table.
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param, "").lower() in ("1", "true", "yes"):
+            self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        payload = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        }
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["results"] = data
+        return Response(payload)
+
+
+class PropertyCursorPagination(CountedCursorPagination):
+    # primary key index serves this ordering in both directions
+    ordering = "-id"
+
+    def get_ordering(self, request, queryset, view):
+        # search results page by relevance, ties broken by id
+        if "search_rank" in queryset.query.annotations:
+            return ("-search_rank", "-id")
+        return super().get_ordering(request, queryset, view)
+
+
+class InquiryCursorPagination(CountedCursorPagination):
+    # backed by the (-created_at, id) index on Inquiry
+    ordering = ("-created_at", "id")
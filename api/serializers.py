@@ -2,20 +2,89 @@
 from rest_framework import serializers
 from realestate_app.models import Property, PropertyImage
 from api.models import Inquiry
+from api.filters import MAX_INT
 from django.db import transaction
 
 class PropertyImageSerializer(serializers.ModelSerializer):
+    srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = PropertyImage
-        fields = ["id", "property", "image"]
+        fields = ["id", "property", "image", "width", "height", "srcset"]
+        read_only_fields = ["width", "height"]
+
+    def get_srcset(self, obj):
+        # {"webp": "<url> 320w, <url> 640w, ...", "jpeg": ...}; empty until
+        # the derivatives job has run
+        if not obj.variants:
+            return {}
+        storage = obj.image.storage
+        srcset = {}
+        for fmt in ("webp", "jpeg"):
+            srcset[fmt] = ", ".join(
+                f"{storage.url(variant[fmt])} {variant['width']}w"
+                for variant in obj.variants.values()
+                if fmt in variant
+            )
+        return srcset
+
+
+class SparseFieldsMixin:
+    # `fields=` keeps only the named fields, `omit=` drops them (the view
+    # validates the names, see PropertyViewSet.selected_fields).
+    # `prefetch_fields` maps a relation field to the queryset method that
+    # loads it, so prepare_queryset() can skip what won't be rendered.
+    prefetch_fields = {}
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+    @classmethod
+    def field_names(cls):
+        return list(cls().fields)
+
+    def prepare_queryset(self, queryset):
+        # .only() the columns the selected fields read; the pk always
+        # stays, it backs the cursor and the prefetches
+        model = queryset.model
+        concrete = {f.name for f in model._meta.concrete_fields}
+        columns = {model._meta.pk.name}
+        for name, field in self.fields.items():
+            if name in self.prefetch_fields:
+                queryset = getattr(queryset, self.prefetch_fields[name])()
+            elif field.source in concrete:
+                columns.add(field.source)
+        return queryset.only(*columns)
+
+
+class PropertySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    images = PropertyImageSerializer(many=True, read_only=True)
+    # only present on ?near= queries (annotated by the filter)
+    distance_km = serializers.FloatField(read_only=True)
 
+    prefetch_fields = {"images": "with_images"}
+
+    class Meta:
+        model = Property
+        exclude = ["search_vector", "geohash"]
 
-class PropertySerializer(serializers.ModelSerializer):
-    images = PropertyImageSerializer(many=True, read_only=True)
+
+class PropertyCardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # the catalog grid card: no description, one image, no join
+    distance_km = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Property
-        fields = "__all__"
+        fields = [
+            "id", "title", "price", "location", "property_type",
+            "bedrooms", "bathrooms", "sold_out", "cover_image", "image_count",
+            "latitude", "longitude", "distance_km",
+        ]
 
 
 class PropertyCreateUpdateSerializer(serializers.ModelSerializer):
@@ -26,6 +95,9 @@ class PropertyCreateUpdateSerializer(serializers.ModelSerializer):
     carpet_area = serializers.FloatField(required=False, allow_null=True)
     super_builtup_area = serializers.FloatField(required=False, allow_null=True)
 
+    latitude = serializers.FloatField(required=False, allow_null=True, min_value=-90, max_value=90)
+    longitude = serializers.FloatField(required=False, allow_null=True, min_value=-180, max_value=180)
+
     class Meta:
         model = Property
         fields = [
@@ -41,9 +113,45 @@ class PropertyCreateUpdateSerializer(serializers.ModelSerializer):
             "plot_area",
             "carpet_area",
             "super_builtup_area",
-        ]
 
+            "latitude",
+            "longitude",
+        ]
 
+    def validate(self, attrs):
+        # a point is both coordinates or neither
+        given = {"latitude", "longitude"} & attrs.keys()
+        if len(given) == 1:
+            missing = ({"latitude", "longitude"} - given).pop()
+            raise serializers.ValidationError({missing: "Send latitude and longitude together."})
+        return attrs
+
+
+
+
+class PropertyBulkSerializer(serializers.Serializer):
+    OPERATIONS = ["mark_sold", "mark_available", "toggle_sold", "update", "delete"]
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_INT), allow_empty=False, max_length=5000
+    )
+    operation = serializers.ChoiceField(choices=OPERATIONS)
+    fields = serializers.DictField(required=False)
+
+    def validate(self, attrs):
+        if attrs["operation"] != "update":
+            return attrs
+        if not attrs.get("fields"):
+            raise serializers.ValidationError({"fields": "Required for the update operation."})
+        # same rules as a single-listing PATCH
+        fields = PropertyCreateUpdateSerializer(data=attrs["fields"], partial=True)
+        if not fields.is_valid():
+            raise serializers.ValidationError({"fields": fields.errors})
+        unknown = set(attrs["fields"]) - set(fields.validated_data)
+        if unknown:
+            raise serializers.ValidationError({"fields": f"Unknown fields: {', '.join(sorted(unknown))}."})
+        attrs["fields"] = fields.validated_data
+        return attrs
 
 
 class InquirySerializer(serializers.ModelSerializer):
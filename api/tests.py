@@ -1,3 +1,1178 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail import get_connection
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from realestate_app import metrics
+from realestate_app.derivatives import run_derivative_job
+from realestate_app.models import DailyStat, Property, PropertyImage
+from realestate_app.suggest import suggest_index
+from .models import Inquiry, OutboxMessage
+from .mailer import EmailDispatcher
+from . import async_views
+from .outbox import claim_batch, deliver, process_batch, run_once
+from .throttling import get_inquiry_guard
+from .whatsapp import CircuitOpenError, WhatsAppClient
+
+
+def make_property(**kwargs):
+    data = {
+        "title": "Test Flat",
+        "price": "2500000.00",
+        "location": "Sector 21",
+        "property_type": "Flat",
+    }
+    data.update(kwargs)
+    return Property.objects.create(**data)
+
+
+LOCAL_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+# "default" stands in for the shared Redis cache production runs with
+@override_settings(CATALOG_CACHE_ALIAS="default")
+class CatalogTestCase(APITestCase):
+    def setUp(self):
+        # cached responses and throttle buckets outlive the per-test rollback
+        cache.clear()
+        get_inquiry_guard().reset()
+
+
+def make_upload(name="photo.jpg", size=(64, 48)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "teal").save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+class PaginationTests(CatalogTestCase):
+    def test_property_list_walks_cursor_pages(self):
+        for i in range(5):
+            make_property(title=f"Flat {i}")
+
+        response = self.client.get("/api/properties/", {"page_size": 2, "count": "true"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 5)
+
+        seen = []
+        url = "/api/properties/?page_size=2"
+        while url:
+            page = self.client.get(url).data
+            seen.extend(item["id"] for item in page["results"])
+            url = page["next"]
+
+        self.assertEqual(seen, sorted(seen, reverse=True))
+        self.assertEqual(len(seen), 5)
+
+    def test_count_is_opt_in(self):
+        response = self.client.get("/api/properties/", {"page_size": 10})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("count", response.data)
+
+    def test_inquiry_list_is_paginated(self):
+        admin = get_user_model().objects.create_superuser("admin", "a@example.com", "pass")
+        self.client.force_authenticate(admin)
+        for i in range(3):
+            Inquiry.objects.create(name=f"Lead {i}", phone="99999")
+
+        response = self.client.get("/api/inquiries/", {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+
+
+class PropertyFilterTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.flat = make_property(title="2BHK Flat", price="4000000", bedrooms=2)
+        self.villa = make_property(title="Villa", property_type="Villa", price="9000000", bedrooms=4)
+        self.plot = make_property(title="Plot", property_type="Plot", price="1500000", plot_area=200, sold_out=True)
+
+    def ids(self, **params):
+        response = self.client.get("/api/properties/", params)
+        self.assertEqual(response.status_code, 200)
+        return {item["id"] for item in response.data["results"]}
+
+    def test_filters(self):
+        self.assertEqual(self.ids(type="Flat,Villa"), {self.flat.id, self.villa.id})
+        self.assertEqual(self.ids(min_price="2000000", max_price="5000000"), {self.flat.id})
+        self.assertEqual(self.ids(min_bedrooms=3), {self.villa.id})
+        self.assertEqual(self.ids(min_plot_area=100), {self.plot.id})
+        self.assertEqual(self.ids(available="false"), {self.plot.id})
+        self.assertEqual(self.ids(posted_since="2000-01-01"), {self.flat.id, self.villa.id, self.plot.id})
+
+    def test_invalid_values_are_rejected(self):
+        response = self.client.get("/api/properties/", {"min_price": "cheap", "type": "Castle"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {"min_price", "type"})
+
+    def test_non_finite_numbers_are_rejected(self):
+        bad = {"min_price": "NaN", "max_price": "1e999999", "min_plot_area": "nan",
+               "max_carpet_area": "Infinity", "min_bedrooms": "99999999999999999999"}
+        for url in ("/api/properties/", "/api/properties/facets/", "/api/async/properties/"):
+            response = self.client.get(url, bad)
+            self.assertEqual(response.status_code, 400, url)
+            self.assertEqual(set(response.json()), set(bad), url)
+        response = self.client.get("/api/properties/", {"near": "nan,77", "radius_km": "inf"})
+        self.assertEqual(set(response.data), {"near", "radius_km"})
+
+
+class PropertySearchTests(CatalogTestCase):
+    def test_search_ranks_title_above_description(self):
+        in_description = make_property(title="Corner Shop", property_type="Shop", description="Near the lake park")
+        in_title = make_property(title="Lake View Villa", property_type="Villa")
+        make_property(title="City Flat")
+
+        response = self.client.get("/api/properties/", {"search": "lake"})
+        ids = [item["id"] for item in response.data["results"]]
+        self.assertEqual(ids, [in_title.id, in_description.id])
+
+    def test_search_follows_edits_and_deletes(self):
+        prop = make_property(title="Old Title", location="Malviya Nagar")
+        self.assertEqual(len(self.client.get("/api/properties/", {"search": "malviya"}).data["results"]), 1)
+
+        prop.location = "Vaishali Nagar"
+        prop.save()
+        self.assertEqual(len(self.client.get("/api/properties/", {"search": "malviya"}).data["results"]), 0)
+        self.assertEqual(len(self.client.get("/api/properties/", {"search": "vaish"}).data["results"]), 1)
+
+        prop.delete()
+        self.assertEqual(len(self.client.get("/api/properties/", {"search": "vaish"}).data["results"]), 0)
+
+    def test_search_pages_by_rank(self):
+        for i in range(5):
+            make_property(title=f"Garden Flat {i}")
+
+        seen = []
+        url = "/api/properties/?search=garden&page_size=2"
+        while url:
+            page = self.client.get(url).data
+            seen.extend(item["id"] for item in page["results"])
+            url = page["next"]
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+
+class SuggestTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        suggest_index.reset()
+        self.addCleanup(suggest_index.reset)
+
+    def texts(self, q):
+        response = self.client.get("/api/properties/suggest/", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return [item["text"] for item in response.data["results"]]
+
+    def test_prefix_matches_any_word(self):
+        make_property(title="Palm Court", location="Vaishali Nagar, Jaipur")
+        make_property(title="Jaipur Heights", location="Mansarovar")
+
+        self.assertEqual(self.texts("jai"), ["Jaipur Heights", "Vaishali Nagar, Jaipur"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.texts("vaish"), ["Vaishali Nagar, Jaipur"])
+
+    def test_index_follows_signals(self):
+        prop = make_property(title="Palm Court", location="Malviya Nagar")
+        self.assertEqual(self.texts("malv"), ["Malviya Nagar"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            prop.location = "Mansarovar"
+            prop.save()
+        self.assertEqual(self.texts("malv"), [])
+        self.assertEqual(self.texts("mans"), ["Mansarovar"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            prop.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.texts("mans"), [])
+
+    def test_stale_index_keeps_serving_while_rebuilding(self):
+        prop = make_property(title="Palm Court", location="Malviya Nagar")
+        self.assertEqual(self.texts("malv"), ["Malviya Nagar"])
+
+        # a set-based write: no signal, the index is only marked stale
+        Property.objects.filter(pk=prop.pk).update(location="Mansarovar")
+        suggest_index.invalidate()
+        with mock.patch.object(suggest_index, "rebuild_in_background") as rebuild:
+            with self.assertNumQueries(0):
+                self.assertEqual(self.texts("malv"), ["Malviya Nagar"])
+        rebuild.assert_called_once()
+
+        suggest_index.build()
+        self.assertEqual(self.texts("malv"), [])
+        self.assertEqual(self.texts("mans"), ["Mansarovar"])
+
+    def test_rebuild_replays_updates_made_during_it(self):
+        kept = make_property(title="Palm Court", location="Malviya Nagar")
+        moved = make_property(title="Lake View", location="Vaishali Nagar")
+        self.texts("x")  # built
+        rows = list(Property.objects.values_list("pk", "location", "title"))
+
+        def rows_with_concurrent_writes():
+            yield rows[0]
+            moved.location = "Mansarovar"
+            suggest_index.update(moved)
+            suggest_index.discard(kept.pk)
+            yield from rows[1:]
+
+        with mock.patch.object(suggest_index, "rows", rows_with_concurrent_writes):
+            suggest_index.build()
+        self.assertEqual(self.texts("mans"), ["Mansarovar"])
+        self.assertEqual(self.texts("nagar"), [])
+
+
+@override_settings(STORAGES=LOCAL_STORAGES, MEDIA_ROOT=tempfile.gettempdir())
+class PropertyQueryCountTests(CatalogTestCase):
+    def make_listings(self, count):
+        for i in range(count):
+            prop = make_property(title=f"Flat {i}")
+            PropertyImage.objects.create(property=prop, image=f"properties/{i}-a.jpg")
+            PropertyImage.objects.create(property=prop, image=f"properties/{i}-b.jpg")
+
+    def test_list_query_count_is_constant(self):
+        # ETag aggregate, the page of properties, then all their images at once
+        self.make_listings(2)
+        with self.assertNumQueries(3):
+            small = self.client.get("/api/properties/", {"page_size": 2})
+
+        self.make_listings(10)
+        with self.assertNumQueries(3):
+            large = self.client.get("/api/properties/", {"page_size": 12})
+
+        self.assertEqual(len(small.data["results"]), 2)
+        self.assertEqual(len(large.data["results"]), 12)
+        self.assertEqual(len(large.data["results"][0]["images"]), 2)
+
+    def test_retrieve_query_count(self):
+        self.make_listings(1)
+        prop = Property.objects.get()
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/api/properties/{prop.id}/")
+        self.assertEqual(len(response.data["images"]), 2)
+
+
+@override_settings(STORAGES=LOCAL_STORAGES, MEDIA_ROOT=tempfile.gettempdir())
+class SparseFieldsTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.prop = make_property(description="Long text " * 50)
+        PropertyImage.objects.create(property=self.prop, image="properties/a.jpg")
+        PropertyImage.objects.create(property=self.prop, image="properties/b.jpg")
+        make_property(title="Bare Plot", property_type="Plot")
+
+    def test_fields_and_omit(self):
+        response = self.client.get("/api/properties/", {"fields": "id,title,price"})
+        self.assertEqual(set(response.data["results"][0]), {"id", "title", "price"})
+
+        response = self.client.get(f"/api/properties/{self.prop.id}/", {"omit": "description,images"})
+        self.assertNotIn("description", response.data)
+        self.assertNotIn("images", response.data)
+        self.assertIn("location", response.data)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get("/api/properties/", {"fields": "title,secret"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fields", response.data)
+
+    def test_selected_columns_only(self):
+        # no images requested: the ETag aggregate and the page, no prefetch
+        with self.assertNumQueries(2) as ctx:
+            self.client.get("/api/properties/", {"fields": "id,title"})
+        self.assertNotIn("description", ctx.captured_queries[-1]["sql"])
+
+    def test_compact_view_is_a_single_table_read(self):
+        # ETag aggregate and the page; cover and count are columns
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/properties/", {"view": "compact"})
+        bare, listing = response.data["results"]
+        self.assertNotIn("description", listing)
+        self.assertNotIn("images", listing)
+        self.assertTrue(listing["cover_image"].endswith("properties/a.jpg"))
+        self.assertEqual(listing["image_count"], 2)
+        self.assertIsNone(bare["cover_image"])
+        self.assertEqual(bare["image_count"], 0)
+
+        response = self.client.get("/api/properties/", {"view": "compact", "omit": "cover_image"})
+        self.assertNotIn("cover_image", response.data["results"][0])
+
+
+class ImageStatsTests(CatalogTestCase):
+    def test_image_writes_keep_cover_and_count(self):
+        prop = make_property()
+        first = PropertyImage.objects.create(property=prop, image="properties/a.jpg")
+        PropertyImage.objects.create(property=prop, image="properties/b.jpg")
+        prop.refresh_from_db()
+        self.assertEqual((prop.cover_image.name, prop.image_count), ("properties/a.jpg", 2))
+
+        first.delete()
+        prop.refresh_from_db()
+        self.assertEqual((prop.cover_image.name, prop.image_count), ("properties/b.jpg", 1))
+
+        prop.images.all().delete()
+        prop.refresh_from_db()
+        self.assertEqual((prop.cover_image.name, prop.image_count), ("", 0))
+
+    def test_listing_delete_skips_per_image_refresh(self):
+        prop = make_property()
+        for name in "abcde":
+            PropertyImage.objects.create(property=prop, image=f"properties/{name}.jpg")
+        # cascade: no lock + UPDATE of the doomed row for every image
+        with self.assertNumQueries(5):
+            prop.delete()
+
+    def test_repair_command(self):
+        prop = make_property()
+        PropertyImage.objects.create(property=prop, image="properties/a.jpg")
+        make_property(title="Bare")
+        Property.objects.filter(pk=prop.pk).update(image_count=7, cover_image="")
+
+        out = io.StringIO()
+        call_command("repair_image_stats", "--dry-run", stdout=out)
+        self.assertIn("1 listings out of step", out.getvalue())
+
+        call_command("repair_image_stats", stdout=io.StringIO())
+        prop.refresh_from_db()
+        self.assertEqual((prop.cover_image.name, prop.image_count), ("properties/a.jpg", 1))
+
+
+class GeoSearchTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        # Connaught Place, ~4 km south (India Gate), Gurgaon (~25 km), Mumbai
+        self.cp = make_property(title="CP", latitude=28.6315, longitude=77.2167)
+        self.gate = make_property(title="Gate", latitude=28.6129, longitude=77.2295)
+        self.gurgaon = make_property(title="Gurgaon", latitude=28.4595, longitude=77.0266)
+        self.mumbai = make_property(title="Mumbai", latitude=19.0760, longitude=72.8777)
+        make_property(title="Nowhere")
+
+    def titles(self, response):
+        return sorted(item["title"] for item in response.data["results"])
+
+    def test_geohash_follows_coordinates(self):
+        self.assertTrue(self.cp.geohash.startswith("ttnfv"))
+        self.cp.latitude, self.cp.longitude = 19.0760, 72.8777
+        self.cp.save(update_fields=["latitude", "longitude"])
+        self.cp.refresh_from_db()
+        self.assertEqual(self.cp.geohash, self.mumbai.geohash)
+
+    def test_radius(self):
+        response = self.client.get("/api/properties/", {"near": "28.6315,77.2167", "radius_km": "5"})
+        self.assertEqual(self.titles(response), ["CP", "Gate"])
+        gate = next(item for item in response.data["results"] if item["title"] == "Gate")
+        self.assertAlmostEqual(gate["distance_km"], 2.5, delta=0.3)
+
+        response = self.client.get("/api/properties/", {"near": "28.6315,77.2167", "radius_km": "30"})
+        self.assertEqual(self.titles(response), ["CP", "Gate", "Gurgaon"])
+
+    def test_bbox(self):
+        response = self.client.get("/api/properties/", {"bbox": "28.4,76.9,28.62,77.3", "view": "compact"})
+        self.assertEqual(self.titles(response), ["Gate", "Gurgaon"])
+        self.assertNotIn("distance_km", response.data["results"][0])
+
+    def test_bad_geo_params(self):
+        response = self.client.get("/api/properties/", {"near": "91,0", "radius_km": "x", "bbox": "1,2,3"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {"near", "radius_km", "bbox"})
+
+    def test_geocode_command(self):
+        Property.objects.update(latitude=None, longitude=None, geohash="")
+        make_property(title="Pune", location="Baner, Pune")
+        path = os.path.join(tempfile.mkdtemp(), "places.csv")
+        with open(path, "w") as f:
+            f.write("place,latitude,longitude\nSector 21,28.5,77.0\npune,18.52,73.85\n")
+
+        out = io.StringIO()
+        call_command("geocode_properties", path, stdout=out)
+        self.assertIn("6 listings geocoded, 0 unmatched", out.getvalue())
+        pune = Property.objects.get(title="Pune")
+        self.assertEqual((pune.latitude, pune.longitude), (18.52, 73.85))
+        self.assertTrue(pune.geohash.startswith("te"))
+
+
+class FacetTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        make_property(price="1500000.00", bedrooms=1)
+        make_property(price="4000000.00", bedrooms=2, sold_out=True)
+        make_property(price="4500000.00", bedrooms=6, property_type="Villa")
+        make_property(price="90000000.00", property_type="Plot")
+
+    def test_counts_in_one_query(self):
+        with self.assertNumQueries(1):
+            data = self.client.get("/api/properties/facets/").data
+        self.assertEqual(data["total"], 4)
+        self.assertEqual(data["property_type"]["Flat"], 2)
+        self.assertEqual(data["property_type"]["Shop"], 0)
+        self.assertEqual({b["key"]: b["count"] for b in data["price"]}["25l_50l"], 2)
+        self.assertEqual(data["bedrooms"], {"1": 1, "2": 1, "3": 0, "4": 0, "5+": 1})
+        self.assertEqual(data["availability"], {"available": 3, "sold": 1})
+
+    def test_honours_list_filters_and_caches(self):
+        data = self.client.get("/api/properties/facets/", {"available": "true", "type": "Flat,Villa"}).data
+        self.assertEqual(data["total"], 2)
+        self.assertEqual(data["availability"]["sold"], 0)
+
+        with self.assertNumQueries(0):
+            self.client.get("/api/properties/facets/", {"available": "true", "type": "Flat,Villa"})
+        make_property(property_type="Villa")
+        data = self.client.get("/api/properties/facets/", {"available": "true", "type": "Flat,Villa"}).data
+        self.assertEqual(data["total"], 3)
+
+        response = self.client.get("/api/properties/facets/", {"min_price": "cheap"})
+        self.assertEqual(response.status_code, 400)
+
+
+class DailyStatsTests(CatalogTestCase):
+    def snapshot(self):
+        return sorted(DailyStat.objects.filter(count__gt=0).values_list("date", "metric", "dimension", "count"))
+
+    def test_incremental_matches_rebuild(self):
+        a, b, c = (make_property(title=t) for t in "abc")
+        make_property(title="d", sold_out=True)
+        Property.objects.filter(pk__in=[a.pk, b.pk]).set_sold_out(True)
+        Property.objects.filter(pk__in=[b.pk, c.pk]).toggle_sold_out()
+        Property.objects.filter(pk=a.pk).delete_listings()
+        c.refresh_from_db()
+        c.sold_out = False
+        c.save()
+
+        Inquiry.objects.create(name="A", phone="1", location="Vaishali  Nagar")
+        Inquiry.objects.create(name="B", phone="2", location="vaishali nagar")
+        moved = Inquiry.objects.create(name="C", phone="3", location="Malviya Nagar")
+        moved.location = "Mansarovar"
+        moved.save()
+        Inquiry.objects.create(name="D", phone="4").delete()
+
+        incremental = self.snapshot()
+        call_command("rebuild_stats", stdout=io.StringIO())
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_summary_endpoint(self):
+        admin = get_user_model().objects.create_superuser("admin", "a@example.com", "pass")
+        make_property()
+        make_property(sold_out=True)
+        Inquiry.objects.create(name="A", phone="1", location="Jaipur")
+
+        self.assertEqual(self.client.get("/api/stats/").status_code, 401)
+        self.client.force_authenticate(admin)
+        with self.assertNumQueries(2):
+            data = self.client.get("/api/stats/", {"days": 7}).data
+        self.assertEqual(len(data["daily"]), 7)
+        self.assertEqual(data["totals"], {"inquiries": 1, "listings_added": 2, "listings_sold": 1})
+        self.assertEqual(data["sold_through_rate"], 0.5)
+        self.assertEqual(data["top_locations"], [{"location": "jaipur", "inquiries": 1}])
+        self.assertEqual(self.client.get("/api/stats/", {"days": 0}).status_code, 400)
+
+
+@override_settings(STORAGES=LOCAL_STORAGES, MEDIA_ROOT=tempfile.gettempdir())
+class ResponseCacheTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = get_user_model().objects.create_superuser("admin", "a@example.com", "pass")
+
+    def test_repeat_reads_skip_the_database(self):
+        prop = make_property()
+        self.client.get("/api/properties/")
+        self.client.get(f"/api/properties/{prop.id}/")
+
+        with self.assertNumQueries(0):
+            self.client.get("/api/properties/")
+            self.client.get(f"/api/properties/{prop.id}/")
+
+        # a different query string is a different entry
+        with self.assertNumQueries(3):
+            self.client.get("/api/properties/", {"type": "Flat"})
+
+    @override_settings(CATALOG_CACHE_ALIAS="catalog")
+    def test_no_process_local_caching_without_a_shared_cache(self):
+        # a bump in one worker cannot reach another's memory, so nothing
+        # is kept there: every read goes to the database
+        prop = make_property()
+        self.client.get(f"/api/properties/{prop.id}/")
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/api/properties/{prop.id}/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_writes_invalidate_cached_responses(self):
+        prop = make_property()
+        self.assertFalse(self.client.get("/api/properties/").data["results"][0]["sold_out"])
+        self.assertFalse(self.client.get(f"/api/properties/{prop.id}/").data["sold_out"])
+
+        self.client.force_authenticate(self.admin)
+        self.client.post(f"/api/properties/{prop.id}/toggle_sold/")
+        self.assertTrue(self.client.get("/api/properties/").data["results"][0]["sold_out"])
+        self.assertTrue(self.client.get(f"/api/properties/{prop.id}/").data["sold_out"])
+
+        PropertyImage.objects.create(property=prop, image="properties/new.jpg")
+        self.assertEqual(len(self.client.get(f"/api/properties/{prop.id}/").data["images"]), 1)
+
+
+@override_settings(STORAGES=LOCAL_STORAGES, MEDIA_ROOT=tempfile.gettempdir())
+class ConditionalGetTests(CatalogTestCase):
+    def test_list_etag(self):
+        prop = make_property()
+        response = self.client.get("/api/properties/")
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/properties/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # a different page or filter has its own ETag
+        response = self.client.get("/api/properties/", {"type": "Flat"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        prop.title = "Renamed"
+        prop.save()
+        response = self.client.get("/api/properties/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        prop.delete()
+        response = self.client.get("/api/properties/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_retrieve_validators(self):
+        prop = make_property()
+        url = f"/api/properties/{prop.id}/"
+        response = self.client.get(url)
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+        etag = response["ETag"]
+        PropertyImage.objects.create(property=prop, image="properties/a.jpg")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_property_is_404(self):
+        self.assertEqual(self.client.get("/api/properties/999/").status_code, 404)
+        self.assertEqual(self.client.get("/api/properties/abc/").status_code, 404)
+
+
+@override_settings(ADMIN_NOTIFICATION_EMAIL="admin@example.com", INQUIRY_EMAIL_DIGEST_WINDOW=0)
+class OutboxTests(APITestCase):
+    def setUp(self):
+        get_inquiry_guard().reset()
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(self.executor.shutdown)
+        self.dispatcher = EmailDispatcher()
+
+    def drain(self):
+        return run_once(self.executor, self.dispatcher, 10)
+
+    def inquire(self, name="Asha"):
+        # distinct messages: identical (phone, message) pairs are deduplicated
+        response = self.client.post("/api/inquiries/", {"name": name, "phone": "98290", "message": f"Call {name}"})
+        self.assertEqual(response.status_code, 201)
+
+    def test_inquiry_and_notifications_are_written_together(self):
+        self.inquire()
+        inquiry = Inquiry.objects.get()
+        self.assertEqual(
+            sorted(inquiry.notifications.values_list("channel", flat=True)), ["email", "whatsapp"]
+        )
+
+    def test_delivery_retries_then_dead_letters(self):
+        self.inquire()
+        whatsapp = mock.Mock(side_effect=ConnectionError("twilio down"))
+
+        with mock.patch.dict("api.outbox.SENDERS", {"whatsapp": whatsapp}):
+            self.assertEqual(self.drain(), (1, 1))
+            # backing off: nothing is due yet
+            self.assertEqual(claim_batch(10), [])
+
+            failed = OutboxMessage.objects.get(channel="whatsapp")
+            self.assertEqual(failed.status, OutboxMessage.PENDING)
+            self.assertIn("twilio down", failed.last_error)
+
+            with self.settings(OUTBOX_MAX_ATTEMPTS=2), self.assertLogs("api.outbox", "ERROR"):
+                OutboxMessage.objects.filter(pk=failed.pk).update(next_attempt_at=failed.created_at)
+                self.assertEqual(self.drain(), (0, 1))
+
+        self.assertEqual(OutboxMessage.objects.get(channel="email").status, OutboxMessage.SENT)
+        self.assertEqual(OutboxMessage.objects.get(channel="whatsapp").status, OutboxMessage.DEAD)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_emails_share_one_connection(self):
+        for name in ("Asha", "Ravi", "Meena"):
+            self.inquire(name)
+
+        with mock.patch.dict("api.outbox.SENDERS", {"whatsapp": mock.Mock()}):
+            with mock.patch("api.mailer.get_connection", wraps=get_connection) as connect:
+                self.assertEqual(self.drain(), (6, 0))
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_digest_coalesces_emails_in_window(self):
+        for name in ("Asha", "Ravi"):
+            self.inquire(name)
+
+        with self.settings(INQUIRY_EMAIL_DIGEST_WINDOW=300):
+            with mock.patch.dict("api.outbox.SENDERS", {"whatsapp": mock.Mock()}):
+                # window still open: only WhatsApp goes out
+                self.assertEqual(self.drain(), (2, 0))
+                self.assertEqual(len(mail.outbox), 0)
+
+                OutboxMessage.objects.update(created_at=timezone.now() - timedelta(minutes=10))
+                self.assertEqual(self.drain(), (2, 0))
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, "2 new inquiries")
+        self.assertIn("Ravi", mail.outbox[0].body)
+
+
+@override_settings(INQUIRY_THROTTLE_RATES={"ip": (20, 3600), "phone": (2, 3600)}, INQUIRY_DUPLICATE_WINDOW=600)
+class InquiryThrottleTests(CatalogTestCase):
+    def inquire(self, phone="98290", message="Is it available?", **extra):
+        return self.client.post("/api/inquiries/", {"name": "Asha", "phone": phone, "message": message}, **extra)
+
+    def test_duplicate_gets_the_original_response_without_queries(self):
+        first = self.inquire()
+        with self.assertNumQueries(0):
+            again = self.inquire(phone="982 90", message="  is it AVAILABLE? ")
+        self.assertEqual((again.status_code, again.data), (201, first.data))
+        self.assertEqual(Inquiry.objects.count(), 1)
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+
+    def test_phone_bucket(self):
+        self.assertEqual(self.inquire(message="one").status_code, 201)
+        self.assertEqual(self.inquire(message="two").status_code, 201)
+        with self.assertNumQueries(0):
+            throttled = self.inquire(message="three")
+        self.assertEqual(throttled.status_code, 429)
+        self.assertIn("Retry-After", throttled)
+        self.assertEqual(self.inquire(phone="11111", message="three").status_code, 201)
+
+    @override_settings(INQUIRY_THROTTLE_RATES={"ip": (1, 3600)})
+    def test_ip_bucket_honours_forwarded_for(self):
+        self.assertEqual(self.inquire(phone="1").status_code, 201)
+        self.assertEqual(self.inquire(phone="2").status_code, 429)
+        # no trusted proxy: a made-up X-Forwarded-For is not a new bucket
+        for num_proxies in (0, None):
+            with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": num_proxies}):
+                self.assertEqual(self.inquire(phone="4", HTTP_X_FORWARDED_FOR="198.51.100.7").status_code, 429)
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}):
+            self.assertEqual(self.inquire(phone="3", HTTP_X_FORWARDED_FOR="203.0.113.9").status_code, 201)
+
+    @override_settings(INQUIRY_THROTTLE_RATES={"ip": (1, 3600)},
+                       REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1})
+    def test_clients_behind_the_router_get_their_own_buckets(self):
+        # the Procfile deploy: one router address, the client appended last
+        for i, client in enumerate(["203.0.113.1", "203.0.113.2", "203.0.113.3"]):
+            response = self.inquire(phone=str(i), REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=client)
+            self.assertEqual(response.status_code, 201, client)
+        response = self.inquire(phone="9", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.1")
+        self.assertEqual(response.status_code, 429)
+
+    def test_failed_attempt_is_not_remembered(self):
+        response = self.client.post("/api/inquiries/", {"phone": "98290", "message": "hello"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post("/api/inquiries/", {"name": "Asha", "phone": "98290", "message": "hello"})
+        self.assertEqual(response.status_code, 201)
+
+    @override_settings(INQUIRY_THROTTLE_BACKEND="cache")
+    def test_shared_cache_backend(self):
+        self.assertEqual(self.inquire().status_code, 201)
+        self.assertEqual(self.inquire().status_code, 201)
+        self.assertEqual(self.inquire(message="other").status_code, 201)
+        self.assertEqual(self.inquire(message="third").status_code, 429)
+        self.assertEqual(Inquiry.objects.count(), 2)
+
+    def test_form_posts_are_guarded(self):
+        prop = make_property()
+        data = {"name": "Asha", "phone": "98290", "message": "Visit?"}
+        for _ in range(2):
+            response = self.client.post(f"/app/property/{prop.id}/", data)
+            self.assertRedirects(response, f"/app/property/{prop.id}/", fetch_redirect_response=False)
+        self.client.post("/app/contact/", data)
+        self.client.post("/app/contact/", data)
+        self.assertEqual(Inquiry.objects.count(), 2)
+
+    def test_form_and_api_do_not_share_duplicates(self):
+        data = {"name": "Asha", "phone": "98290", "message": "Visit?"}
+        self.client.post("/app/contact/", data)
+        for url in ("/api/inquiries/", "/api/async/inquiries/"):
+            with self.settings(OUTBOX_FAST_PATH=False):
+                response = self.client.post(url, data, format="json")
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json()["name"], "Asha")
+        self.assertEqual(Inquiry.objects.count(), 2)
+
+
+class WhatsAppClientTests(APITestCase):
+    def setUp(self):
+        get_inquiry_guard().reset()
+
+    @override_settings(NOTIFY_BREAKER_THRESHOLD=2, NOTIFY_BREAKER_RESET=60)
+    def test_circuit_opens_after_repeated_failures(self):
+        client = WhatsAppClient()
+        with mock.patch.object(client.session, "post", side_effect=requests.ConnectionError) as post:
+            for _ in range(2):
+                with self.assertRaises(requests.ConnectionError):
+                    client.send("hello")
+            with self.assertRaises(CircuitOpenError):
+                client.send("hello")
+        self.assertEqual(post.call_count, 2)
+
+    @override_settings(NOTIFY_BREAKER_THRESHOLD=2, NOTIFY_BREAKER_RESET=60)
+    def test_only_upstream_errors_trip_the_circuit(self):
+        client = WhatsAppClient()
+
+        def reply(status):
+            response = requests.Response()
+            response.status_code = status
+            return response
+
+        with mock.patch.object(client.session, "post", side_effect=[reply(400)] * 3) as post:
+            for _ in range(3):
+                with self.assertRaises(requests.HTTPError):
+                    client.send("hello")
+        self.assertEqual(post.call_count, 3)
+
+        with mock.patch.object(client.session, "post", side_effect=[reply(429), reply(503)]):
+            for _ in range(2):
+                with self.assertRaises(requests.HTTPError):
+                    client.send("hello")
+        with self.assertRaises(CircuitOpenError):
+            client.send("hello")
+
+    def test_accepted_message_without_json_counts_as_sent(self):
+        client = WhatsAppClient()
+        response = requests.Response()
+        response.status_code = 201
+        response._content = b"<html>Created</html>"
+        with mock.patch.object(client.session, "post", return_value=response):
+            self.assertIsNone(client.send("hello"))
+        self.assertEqual(client.breaker.failures, 0)
+
+    def test_open_circuit_defers_without_spending_an_attempt(self):
+        self.client.post("/api/inquiries/", {"name": "Asha", "phone": "98290"})
+        closed = mock.Mock(side_effect=CircuitOpenError)
+        with mock.patch.dict("api.outbox.SENDERS", {"whatsapp": closed}):
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                process_batch(claim_batch(10, channels=["whatsapp"]), executor, EmailDispatcher())
+
+        message = OutboxMessage.objects.get(channel="whatsapp")
+        self.assertEqual(message.status, OutboxMessage.PENDING)
+        self.assertEqual(message.attempts, 0)
+
+
+class AsyncEndpointTests(CatalogTestCase):
+    def inquire(self, **data):
+        data = {"name": "Asha", "phone": "98290", "message": "Is it available?", **data}
+        return self.client.post("/api/async/inquiries/", data, format="json")
+
+    async def ainquire(self, **data):
+        # ASGI request; waits for the fast path the response did not wait for
+        data = {"name": "Asha", "phone": "98290", "message": "Is it available?", **data}
+        response = await self.async_client.post("/api/async/inquiries/", data, content_type="application/json")
+        await asyncio.gather(*async_views.background)
+        return response
+
+    async def test_inquiry_sends_whatsapp_after_responding(self):
+        started, sent = asyncio.Event(), asyncio.Event()
+
+        async def block(payload):
+            started.set()
+            await sent.wait()
+
+        sender = mock.AsyncMock(side_effect=block)
+        with mock.patch.dict("api.outbox.ASYNC_SENDERS", {"whatsapp": sender}):
+            response = await self.async_client.post(
+                "/api/async/inquiries/", {"name": "Asha", "phone": "98290"}, content_type="application/json"
+            )
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json()["name"], "Asha")
+            # answered while the send is still blocked: the row is leased
+            # to the fast path but not sent
+            await asyncio.wait_for(started.wait(), 5)
+            whatsapp = await OutboxMessage.objects.aget(channel="whatsapp")
+            self.assertEqual(whatsapp.status, OutboxMessage.PROCESSING)
+            sent.set()
+            await asyncio.gather(*async_views.background)
+
+        whatsapp = await OutboxMessage.objects.aget(channel="whatsapp")
+        self.assertEqual(whatsapp.status, OutboxMessage.SENT)
+        sender.assert_awaited_once_with(whatsapp.payload)
+        # email has no async sender: left to the worker
+        email = await OutboxMessage.objects.aget(channel="email")
+        self.assertEqual(email.status, OutboxMessage.PENDING)
+
+    async def test_failed_or_slow_send_is_left_to_the_worker(self):
+        async def slow(payload):
+            await asyncio.sleep(1)
+
+        with mock.patch.dict("api.outbox.ASYNC_SENDERS", {"whatsapp": mock.AsyncMock(side_effect=ConnectionError("down"))}):
+            self.assertEqual((await self.ainquire(message="first")).status_code, 201)
+        with self.settings(OUTBOX_FAST_PATH_TIMEOUT=0.01):
+            with mock.patch.dict("api.outbox.ASYNC_SENDERS", {"whatsapp": slow}):
+                self.assertEqual((await self.ainquire(message="second")).status_code, 201)
+
+        failed, slowed = [m async for m in OutboxMessage.objects.filter(channel="whatsapp").order_by("id")]
+        self.assertEqual((failed.status, failed.attempts), (OutboxMessage.PENDING, 1))
+        self.assertIn("down", failed.last_error)
+        # a timeout's outcome is unknown: deferred without spending an attempt
+        self.assertEqual((slowed.status, slowed.attempts), (OutboxMessage.PENDING, 0))
+
+    def test_wsgi_leaves_delivery_to_the_worker(self):
+        # the per-request event loop would not outlive the response
+        sender = mock.AsyncMock()
+        with mock.patch.dict("api.outbox.ASYNC_SENDERS", {"whatsapp": sender}):
+            self.assertEqual(self.inquire().status_code, 201)
+        sender.assert_not_awaited()
+        self.assertEqual(OutboxMessage.objects.get(channel="whatsapp").status, OutboxMessage.PENDING)
+
+    @override_settings(OUTBOX_FAST_PATH=False)
+    def test_inquiry_validation_and_duplicates(self):
+        self.assertEqual(self.inquire(name="").status_code, 400)
+        first = self.inquire()
+        repeat = self.inquire()
+        self.assertEqual(repeat.status_code, 201)
+        self.assertEqual(repeat.json(), first.json())
+        self.assertEqual(Inquiry.objects.count(), 1)
+
+    @override_settings(STORAGES=LOCAL_STORAGES, MEDIA_ROOT=tempfile.gettempdir())
+    def test_property_reads_match_the_drf_views(self):
+        props = [make_property(title=f"Flat {i}") for i in range(3)]
+        PropertyImage.objects.create(property=props[0], image="properties/a.jpg")
+
+        detail = self.client.get(f"/api/async/properties/{props[0].pk}/")
+        self.assertEqual(detail.json(), self.client.get(f"/api/properties/{props[0].pk}/").json())
+        self.assertEqual(self.client.get("/api/async/properties/999999/").status_code, 404)
+
+        page = self.client.get("/api/async/properties/", {"page_size": 2, "view": "compact"}).json()
+        self.assertEqual([p["id"] for p in page["results"]], [props[2].pk, props[1].pk])
+        page = self.client.get(page["next"]).json()
+        self.assertEqual([p["id"] for p in page["results"]], [props[0].pk])
+        self.assertIsNone(page["next"])
+
+        self.assertEqual(self.client.get("/api/async/properties/", {"min_price": "x"}).status_code, 400)
+
+
+class MetricsTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_server_timing_counts_queries(self):
+        make_property()
+        # the ETag probe and the page
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/properties/", {"view": "compact"})
+        self.assertRegex(response["Server-Timing"], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="2 queries"$')
+
+    def test_notification_time_is_recorded(self):
+        message = mock.Mock(channel="whatsapp", payload={})
+        with mock.patch.dict("api.outbox.SENDERS", {"whatsapp": mock.Mock()}):
+            self.assertIsNone(deliver(message))
+        self.assertIn('notification_duration_seconds_count{channel="whatsapp"} 1', metrics.render())
+
+    def test_metrics_endpoint_is_superuser_only(self):
+        self.client.get("/api/properties/")
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+
+        admin = get_user_model().objects.create_superuser("admin", "a@example.com", "pass")
+        self.client.force_authenticate(admin)
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        labels = 'view="properties-list",method="GET",status="2xx"'
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1', body)
+        self.assertIn(f"http_request_duration_seconds_count{{{labels}}} 1", body)
+        self.assertIn('db_queries_total{view="properties-list"} 2', body)
+
+
+class ImageUploadTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media = tempfile.mkdtemp()
+        storage = override_settings(STORAGES=LOCAL_STORAGES, MEDIA_ROOT=self.media)
+        storage.enable()
+        self.addCleanup(storage.disable)
+
+        self.prop = make_property()
+        admin = get_user_model().objects.create_superuser("admin", "a@example.com", "pass")
+        self.client.force_authenticate(admin)
+
+    def upload(self, files):
+        return self.client.post(
+            "/api/property-images/", {"property": self.prop.id, "images": files}, format="multipart"
+        )
+
+    def stored_files(self):
+        return [name for _, _, names in os.walk(self.media) for name in names]
+
+    def test_uploads_all_files(self):
+        response = self.upload([make_upload(f"{i}.jpg") for i in range(5)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(self.prop.images.count(), 5)
+        self.assertEqual(len(self.stored_files()), 5)
+        # derivatives are queued, not generated in the request
+        job = OutboxMessage.objects.get(channel="image_derivatives")
+        self.assertEqual(sorted(job.payload["image_ids"]), sorted(item["id"] for item in response.data))
+
+    def test_derivatives(self):
+        buffer = io.BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = "CameraCo"
+        Image.new("RGB", (2000, 1000), "teal").save(buffer, "JPEG", exif=exif)
+        upload = SimpleUploadedFile("big.jpg", buffer.getvalue(), content_type="image/jpeg")
+        self.upload([upload])
+
+        job = OutboxMessage.objects.get(channel="image_derivatives")
+        run_derivative_job(job.payload)
+
+        image = self.prop.images.get()
+        self.assertEqual((image.width, image.height), (2000, 1000))
+        self.assertEqual(image.variants["thumb"]["width"], 320)
+        self.assertEqual(image.variants["card"]["height"], 320)
+
+        with image.image.storage.open(image.variants["full"]["jpeg"]) as f:
+            full = Image.open(f)
+            self.assertEqual(full.size, (1600, 800))
+            self.assertEqual(dict(full.getexif()), {})
+
+        srcset = self.client.get(f"/api/property-images/{image.id}/").data["srcset"]
+        self.assertEqual(srcset["webp"].count("w, "), 2)
+        self.assertTrue(srcset["webp"].endswith("_full.webp 1600w"))
+
+    def test_invalid_file_rejects_the_whole_batch(self):
+        bad = SimpleUploadedFile("notes.jpg", b"not an image", content_type="image/jpeg")
+        response = self.upload([make_upload(), bad])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("notes.jpg", response.data)
+        self.assertEqual(self.prop.images.count(), 0)
+        self.assertEqual(self.stored_files(), [])
+
+    def test_failed_upload_removes_the_others(self):
+        real_save = FileSystemStorage.save
+
+        def flaky_save(storage, name, content, max_length=None):
+            if content.name == "2.jpg":
+                raise OSError("storage unavailable")
+            return real_save(storage, name, content, max_length=max_length)
+
+        with mock.patch.object(FileSystemStorage, "save", flaky_save):
+            response = self.upload([make_upload(f"{i}.jpg") for i in range(4)])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.prop.images.count(), 0)
+        self.assertEqual(self.stored_files(), [])
+
+
+class ExportTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = get_user_model().objects.create_superuser("admin", "a@example.com", "pass")
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_requires_superuser(self):
+        self.assertIn(self.client.get("/api/inquiries/export/csv/").status_code, (401, 403))
+        self.assertIn(self.client.get("/api/properties/export/csv/").status_code, (401, 403))
+
+    def test_inquiry_csv_with_since(self):
+        old = Inquiry.objects.create(name="Old Lead", phone="1")
+        Inquiry.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=30))
+        Inquiry.objects.create(name="New, Lead", phone="2")
+
+        self.client.force_authenticate(self.admin)
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        lines = self.read(self.client.get("/api/inquiries/export/csv/", {"since": since})).splitlines()
+        self.assertEqual(lines[0], "id,name,phone,email,location,message,created_at")
+        self.assertEqual(len(lines), 2)
+        self.assertIn('"New, Lead"', lines[1])
+
+    def test_csv_escapes_formulas(self):
+        Inquiry.objects.create(name='=HYPERLINK("http://evil.example","x")', phone="+911234567890",
+                               message="@SUM(A1)")
+
+        self.client.force_authenticate(self.admin)
+        body = self.read(self.client.get("/api/inquiries/export/csv/"))
+        self.assertIn("'=HYPERLINK", body)
+        self.assertIn("'+911234567890", body)
+        self.assertIn("'@SUM(A1)", body)
+
+        # the NDJSON export is data, not a spreadsheet: values stay as stored
+        row = json.loads(self.read(self.client.get("/api/inquiries/export/ndjson/")).splitlines()[0])
+        self.assertEqual(row["message"], "@SUM(A1)")
+
+    async def test_asgi_export_streams_in_chunks(self):
+        for i in range(3):
+            await Inquiry.objects.acreate(name=f"Lead {i}", phone=str(i))
+        token = AccessToken.for_user(self.admin)
+        with mock.patch("api.export.EXPORT_CHUNK_SIZE", 2):
+            response = await self.async_client.get(
+                "/api/inquiries/export/csv/", headers={"Authorization": f"Bearer {token}"}
+            )
+            self.assertEqual(response.status_code, 200)
+            # an async iterator: ASGI sends each chunk as it is produced
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        # the header and three rows, two lines per chunk
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(b"".join(chunks).decode().count("Lead"), 3)
+
+    def test_property_ndjson_honours_filters(self):
+        make_property(title="Villa", property_type="Villa")
+        make_property(title="Flat")
+
+        self.client.force_authenticate(self.admin)
+        body = self.read(self.client.get("/api/properties/export/ndjson/", {"type": "Villa"}))
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row["title"] for row in rows], ["Villa"])
+        self.assertEqual(rows[0]["price"], "2500000.00")
+
+
+class ImportPropertiesTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dir = tempfile.mkdtemp()
+        storage = override_settings(STORAGES=LOCAL_STORAGES, MEDIA_ROOT=os.path.join(self.dir, "media"))
+        storage.enable()
+        self.addCleanup(storage.disable)
+
+        Image.new("RGB", (40, 30), "teal").save(os.path.join(self.dir, "front.jpg"))
+        self.source = os.path.join(self.dir, "listings.csv")
+        with open(self.source, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["title", "price", "location", "property_type", "bedrooms", "plot_area", "images"])
+            writer.writerow(["Lake Flat", "3500000", "Vaishali Nagar", "Flat", "2", "", "front.jpg"])
+            writer.writerow(["Bad Row", "cheap", "Nowhere", "Castle", "", "", ""])
+            writer.writerow(["Plot A", "1500000", "Ajmer Road", "Plot", "", "200", ""])
+
+    def run_import(self, *args):
+        report = os.path.join(self.dir, "report.csv")
+        call_command(
+            "import_properties", self.source, "--batch-size", "2", "--report", report,
+            "--images-root", self.dir, *args, stdout=io.StringIO(),
+        )
+        with open(report) as f:
+            return list(csv.DictReader(f))
+
+    def test_dry_run_writes_nothing(self):
+        report = self.run_import("--dry-run")
+        self.assertEqual(Property.objects.count(), 0)
+        self.assertEqual([row["row"] for row in report], ["3"])
+        self.assertEqual(set(json.loads(report[0]["errors"])), {"price", "property_type"})
+
+    def test_import(self):
+        self.run_import()
+        self.assertEqual(
+            sorted(Property.objects.values_list("title", flat=True)), ["Lake Flat", "Plot A"]
+        )
+        self.assertEqual(Property.objects.get(title="Lake Flat").images.count(), 1)
+        self.assertEqual(Property.objects.get(title="Plot A").plot_area, 200)
+        # bulk-created rows are searchable
+        response = self.client.get("/api/properties/", {"search": "vaishali"})
+        self.assertEqual([item["title"] for item in response.data["results"]], ["Lake Flat"])
+
+    def test_malformed_json_rows_are_reported(self):
+        good = {"title": "Plot A", "price": "1500000", "location": "Ajmer Road", "property_type": "Plot"}
+        self.source = os.path.join(self.dir, "listings.ndjson")
+        with open(self.source, "w") as f:
+            f.write(json.dumps(good) + "\n{not json\n[1, 2]\n")
+        report = self.run_import()
+
+        self.source = os.path.join(self.dir, "listings.json")
+        with open(self.source, "w") as f:
+            json.dump([good, "a string", None], f)
+        report += self.run_import()
+
+        self.assertEqual(Property.objects.count(), 2)
+        self.assertEqual([row["row"] for row in report], ["2", "3", "2", "3"])
+        self.assertIn("Invalid JSON", report[0]["errors"])
+        self.assertIn("Expected an object", report[1]["errors"])
+
+
+@override_settings(STORAGES=LOCAL_STORAGES, MEDIA_ROOT=tempfile.gettempdir())
+class BulkActionTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = get_user_model().objects.create_superuser("admin", "a@example.com", "pass")
+        self.client.force_authenticate(self.admin)
+        self.props = [make_property(title=f"Flat {i}") for i in range(4)]
+        self.ids = [p.id for p in self.props]
+
+    def bulk(self, **body):
+        return self.client.post("/api/properties/bulk/", body, format="json")
+
+    def test_mark_sold_is_one_update(self):
+        # savepoint, the UPDATE, the daily-stats upsert, release
+        with self.assertNumQueries(4):
+            response = self.bulk(ids=self.ids[:3], operation="mark_sold")
+        self.assertEqual(response.data, {"operation": "mark_sold", "updated": 3})
+        self.assertEqual(Property.objects.filter(sold_out=True).count(), 3)
+
+        response = self.bulk(ids=self.ids, operation="toggle_sold")
+        self.assertEqual(response.data["updated"], 4)
+        self.assertEqual(list(Property.objects.filter(sold_out=True).values_list("id", flat=True)), [self.ids[3]])
+
+    def test_update_fields_reindexes_search(self):
+        response = self.bulk(ids=self.ids[:2], operation="update", fields={"location": "Jagatpura", "price": "100"})
+        self.assertEqual(response.data["updated"], 2)
+        found = self.client.get("/api/properties/", {"search": "jagatpura"}).data["results"]
+        self.assertEqual(sorted(item["id"] for item in found), sorted(self.ids[:2]))
+
+        response = self.bulk(ids=self.ids, operation="update", fields={"price": "free"})
+        self.assertEqual(response.status_code, 400)
+        response = self.bulk(ids=self.ids, operation="update", fields={"sold_out": True})
+        self.assertEqual(response.status_code, 400)
+
+    def test_delete_removes_images_and_index(self):
+        PropertyImage.objects.create(property=self.props[0], image="properties/x.jpg")
+        response = self.bulk(ids=self.ids[:2], operation="delete")
+        self.assertEqual(response.data["deleted"], 2)
+        self.assertEqual(Property.objects.count(), 2)
+        self.assertEqual(PropertyImage.objects.count(), 0)
+        self.assertEqual(len(self.client.get("/api/properties/", {"search": "flat"}).data["results"]), 2)
+
+    def test_toggle_sold(self):
+        prop = self.props[0]
+        self.assertEqual(self.client.post(f"/api/properties/{prop.id}/toggle_sold/").data, {"sold_out": True})
+        self.assertEqual(self.client.post(f"/api/properties/{prop.id}/toggle_sold/").data, {"sold_out": False})
+        self.assertEqual(self.client.post("/api/properties/999/toggle_sold/").status_code, 404)
+        self.assertEqual(self.client.post("/api/properties/abc/toggle_sold/").status_code, 404)
+        self.assertEqual(self.client.post(f"/api/properties/{10 ** 20}/toggle_sold/").status_code, 404)
+
+    def test_out_of_range_ids_are_rejected(self):
+        response = self.bulk(ids=[self.ids[0], 10 ** 20], operation="mark_sold")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ids", response.data)
+        self.assertFalse(Property.objects.filter(sold_out=True).exists())
+
+    def test_requires_superuser(self):
+        self.client.force_authenticate(None)
+        self.assertIn(self.bulk(ids=self.ids, operation="delete").status_code, (401, 403))
+        self.assertEqual(Property.objects.count(), 4)
@@ -0,0 +1,256 @@
+# api/throttling.py
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+# ----------------------------------------
+# STATE STORES
+# ----------------------------------------
+# "local": per-process dict; cheapest, but each worker counts on its own.
+# "cache": the Django cache (Redis in production), shared by all workers.
+
+class LocalStore:
+    def __init__(self, max_entries=50_000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.mutex = threading.Lock()
+        # get/set take `mutex` themselves; this one keeps a bucket's
+        # read-modify-write whole
+        self.bucket_mutex = threading.Lock()
+
+    def _live(self, key, now):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self.entries[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self.mutex:
+            entry = self._live(key, time.monotonic())
+            return None if entry is None else entry[1]
+
+    def set(self, key, value, timeout):
+        with self.mutex:
+            self._set(key, value, timeout)
+
+    def _set(self, key, value, timeout):
+        self.entries[key] = (time.monotonic() + timeout, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def add(self, key, value, timeout):
+        with self.mutex:
+            if self._live(key, time.monotonic()) is not None:
+                return False
+            self._set(key, value, timeout)
+            return True
+
+    def delete(self, key):
+        with self.mutex:
+            self.entries.pop(key, None)
+
+    @contextmanager
+    def lock(self, key):
+        with self.bucket_mutex:
+            yield
+
+    def clear(self):
+        with self.mutex:
+            self.entries.clear()
+
+
+class CacheStore:
+    def __init__(self, alias="default"):
+        self.cache = caches[alias]
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value, timeout):
+        self.cache.set(key, value, timeout)
+
+    def add(self, key, value, timeout):
+        return self.cache.add(key, value, timeout)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    @contextmanager
+    def lock(self, key, attempts=5):
+        # Best effort: if the lock stays busy the update goes ahead
+        # unlocked, which at worst lets one extra request through.
+        lock_key = f"{key}:lock"
+        for _ in range(attempts):
+            if self.cache.add(lock_key, 1, 2):
+                try:
+                    yield
+                finally:
+                    self.cache.delete(lock_key)
+                return
+            time.sleep(0.01)
+        yield
+
+    def clear(self):
+        pass
+
+
+# ----------------------------------------
+# TOKEN BUCKET
+# ----------------------------------------
+def take_token(store, key, capacity, period):
+    # `capacity` tokens, refilled evenly over `period` seconds.
+    # -> (allowed, seconds until the next token)
+    now = time.time()
+    rate = capacity / period
+    with store.lock(key):
+        tokens, stamp = store.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - stamp) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        store.set(key, (tokens, now), period)
+    return allowed, 0 if allowed else (1 - tokens) / rate
+
+
+# ----------------------------------------
+# INQUIRY GUARD
+# ----------------------------------------
+def normalise_phone(phone):
+    phone = str(phone or "").strip()
+    return ("+" if phone.startswith("+") else "") + re.sub(r"\D", "", phone)
+
+
+def normalise_message(message):
+    return " ".join(str(message or "").split()).lower()
+
+
+def client_ip(request):
+    # honours REST_FRAMEWORK["NUM_PROXIES"] like DRF's own throttles; left
+    # unset, DRF would key on the whole (client-supplied) X-Forwarded-For
+    if api_settings.NUM_PROXIES is None:
+        return request.META.get("REMOTE_ADDR")
+    return BaseThrottle().get_ident(request)
+
+
+class Admission:
+    # What InquiryGuard.admit decided. When `duplicate`, `original` is what
+    # the first submission answered (None while it is still in flight);
+    # when `throttled`, retry after `wait`. Otherwise the caller goes ahead
+    # and then calls remember() on success and release() in any case.
+
+    def __init__(self, guard, key=None, duplicate=False, original=None, throttled=False, wait=0):
+        self.guard = guard
+        self.key = key
+        self.duplicate = duplicate
+        self.original = original
+        self.throttled = throttled
+        self.wait = wait
+        self.remembered = False
+
+    def remember(self, response):
+        if self.key:
+            self.guard.store.set(self.key, {"response": response}, self.guard.window)
+            self.remembered = True
+
+    def release(self):
+        # safe to call unconditionally (e.g. in a finally): keeps a
+        # remembered response, frees the key after a failed attempt
+        if self.key and not self.remembered:
+            self.guard.store.delete(self.key)
+
+
+class InquiryGuard:
+    # Runs before an inquiry touches the database or the outbox:
+    # 1. an identical (scope, phone, message) within the window gets the
+    #    first submission's answer and costs nothing else;
+    # 2. otherwise one token from the IP bucket and one from the phone bucket.
+
+    PENDING = {"pending": True}
+
+    def __init__(self, store, rates, window):
+        self.store = store
+        self.rates = rates
+        self.window = window
+
+    def duplicate_key(self, scope, phone, message):
+        digest = hashlib.sha1(f"{scope}|{phone}|{normalise_message(message)}".encode()).hexdigest()
+        return f"inquiry:dup:{digest}"
+
+    def admit(self, request, phone, message, scope="inquiry"):
+        phone = normalise_phone(phone)
+        key = self.duplicate_key(scope, phone, message) if phone and self.window else None
+
+        if key and not self.store.add(key, self.PENDING, self.window):
+            original = self.wait_for_original(key)
+            # the first attempt failed and let go of the key: this one is new
+            if original is not None or not self.store.add(key, self.PENDING, self.window):
+                return Admission(self, duplicate=True, original=original)
+
+        for bucket, ident in (("ip", client_ip(request)), ("phone", phone)):
+            if not ident or bucket not in self.rates:
+                continue
+            capacity, period = self.rates[bucket]
+            allowed, wait = take_token(self.store, f"inquiry:bucket:{bucket}:{ident}", capacity, period)
+            if not allowed:
+                if key:
+                    self.store.delete(key)
+                return Admission(self, throttled=True, wait=wait)
+
+        return Admission(self, key=key)
+
+    def wait_for_original(self, key, timeout=2.0):
+        # the first submission may still be in flight (a double click)
+        deadline = time.monotonic() + timeout
+        while True:
+            entry = self.store.get(key)
+            if entry is None or "response" in entry or time.monotonic() >= deadline:
+                return (entry or {}).get("response")
+            time.sleep(0.05)
+
+    def reset(self):
+        self.store.clear()
+
+
+_guard = None
+_guard_lock = threading.Lock()
+
+
+def get_inquiry_guard():
+    global _guard
+    if _guard is None:
+        with _guard_lock:
+            if _guard is None:
+                if getattr(settings, "INQUIRY_THROTTLE_BACKEND", "local") == "cache":
+                    store = CacheStore(getattr(settings, "INQUIRY_THROTTLE_CACHE_ALIAS", "default"))
+                else:
+                    store = LocalStore()
+                _guard = InquiryGuard(
+                    store,
+                    getattr(settings, "INQUIRY_THROTTLE_RATES", {}),
+                    getattr(settings, "INQUIRY_DUPLICATE_WINDOW", 600),
+                )
+    return _guard
+
+
+@receiver(setting_changed)
+def reset_inquiry_guard(setting=None, **kwargs):
+    global _guard
+    if setting is None or setting.startswith("INQUIRY_"):
+        if _guard is not None:
+            _guard.reset()
+        _guard = None
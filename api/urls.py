@@ -1,16 +1,23 @@
 # api/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PropertyViewSet, InquiryViewSet, PropertyImageViewSet
+from .views import PropertyViewSet, InquiryViewSet, PropertyImageViewSet, StatsViewSet
+from . import async_views
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 router = DefaultRouter()
 router.register("properties", PropertyViewSet, basename="properties")
 router.register("inquiries", InquiryViewSet, basename="inquiries")
 router.register("property-images", PropertyImageViewSet, basename="property-images")
+router.register("stats", StatsViewSet, basename="stats")
 
 urlpatterns = [
     path("", include(router.urls)),
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+
+    # native async twins, for the ASGI serving mode
+    path("async/inquiries/", async_views.inquiry_create, name="async-inquiry-create"),
+    path("async/properties/", async_views.property_list, name="async-property-list"),
+    path("async/properties/<int:pk>/", async_views.property_detail, name="async-property-detail"),
 ]
@@ -2,35 +2,90 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, Throttled, ValidationError
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.http import HttpResponse
 
+from realestate_app import metrics
 from realestate_app.models import Property, PropertyImage
+from realestate_app.stats import summary
+from realestate_app.suggest import suggest_index
+from realestate_app.uploads import ImageUploadError, upload_property_images
 from .models import Inquiry 
-from .serializers import PropertySerializer, PropertyImageSerializer, PropertyCreateUpdateSerializer, InquirySerializer
+from .serializers import (
+    PropertySerializer, PropertyCardSerializer, PropertyImageSerializer,
+    PropertyCreateUpdateSerializer, PropertyBulkSerializer, InquirySerializer,
+)
 from .permissions import IsSuperUser
+from .pagination import PropertyCursorPagination, InquiryCursorPagination
+from .filters import PropertyFilterBackend, PropertySearchBackend, parse_int
+from .cache import CatalogCacheMixin
+from .conditional import ConditionalGetMixin
+from .facets import facet_counts
+from .export import (
+    INQUIRY_EXPORT_FIELDS, PROPERTY_EXPORT_FIELDS, filter_range, stream_export,
+)
 
-import os, requests
-from django.core.mail import send_mail
-import threading
-
-def run_async(func, *args, **kwargs):
-    thread = threading.Thread(target=func, args=args, kwargs=kwargs)
-    thread.daemon = True
-    thread.start()
+from django.db import transaction
+from .notifications import enqueue_inquiry_notifications
+from .throttling import get_inquiry_guard
 
 # ----------------------------------------
 # PROPERTY VIEWSET (CREATE/UPDATE = ADMIN)
 # ----------------------------------------
-class PropertyViewSet(viewsets.ModelViewSet):
-    queryset = Property.objects.all().order_by("-id")
+class PropertyViewSet(ConditionalGetMixin, CatalogCacheMixin, viewsets.ModelViewSet):
+    queryset = Property.objects.order_by("-id")
+    pagination_class = PropertyCursorPagination
+    filter_backends = [PropertyFilterBackend, PropertySearchBackend]
+
+    # list/retrieve take ?fields=a,b / ?omit=c, and the list takes
+    # ?view=compact for the card representation (cover image only)
+    READ_ACTIONS = ('list', 'retrieve')
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return PropertyCreateUpdateSerializer
+        if self.action == 'list' and self.request.query_params.get('view') == 'compact':
+            return PropertyCardSerializer
         return PropertySerializer
 
+    def selected_fields(self):
+        # -> {"fields": [...] or None, "omit": [...]}; unknown names are a 400
+        params = self.request.query_params
+        available = self.get_serializer_class().field_names()
+        selection, errors = {"fields": None, "omit": []}, {}
+        for param in ("fields", "omit"):
+            raw = params.get(param, "")
+            names = [name.strip() for name in raw.split(",") if name.strip()]
+            if not names:
+                continue
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                errors[param] = [f"Unknown fields: {', '.join(unknown)}."]
+            selection[param] = names
+        if errors:
+            raise ValidationError(errors)
+        return selection
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.READ_ACTIONS:
+            if not hasattr(self, "_field_selection"):
+                self._field_selection = self.selected_fields()
+            kwargs.update(self._field_selection)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.READ_ACTIONS:
+            # fetch only the columns and relations the response will use
+            queryset = self.get_serializer().prepare_queryset(queryset)
+        return queryset
+
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'suggest', 'facets']:
             return [AllowAny()]
         return [IsSuperUser()]
     
@@ -44,10 +99,63 @@ class PropertyViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'], permission_classes=[IsSuperUser])
     def toggle_sold(self, request, pk=None):
-        prop = self.get_object()
-        prop.sold_out = not prop.sold_out
-        prop.save()
-        return Response({"sold_out": prop.sold_out})
+        # atomic flip in SQL; no read-modify-write race
+        try:
+            listing = Property.objects.filter(pk=parse_int(pk))
+        except ValueError:
+            raise NotFound()
+        if not listing.toggle_sold_out():
+            raise NotFound()
+        return Response({"sold_out": listing.values_list("sold_out", flat=True).get()})
+
+    @action(detail=False, methods=['post'], permission_classes=[IsSuperUser])
+    def bulk(self, request):
+        # {"ids": [...], "operation": "mark_sold" | "mark_available" |
+        #  "toggle_sold" | "update" | "delete", "fields": {...}}
+        serializer = PropertyBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+        operation = serializer.validated_data["operation"]
+        listings = Property.objects.filter(pk__in=ids)
+
+        if operation == "delete":
+            return Response({"operation": operation, "deleted": listings.delete_listings()})
+
+        if operation == "mark_sold":
+            changed = listings.set_sold_out(True)
+        elif operation == "mark_available":
+            changed = listings.set_sold_out(False)
+        elif operation == "toggle_sold":
+            changed = listings.toggle_sold_out()
+        else:
+            changed = listings.update_fields(**serializer.validated_data["fields"])
+        return Response({"operation": operation, "updated": changed})
+
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        # served from the in-process prefix index, no DB query
+        q = request.query_params.get("q", "")
+        try:
+            limit = min(int(request.query_params.get("limit", 8)), 20)
+        except ValueError:
+            limit = 8
+        return Response({"q": q, "results": suggest_index.suggest(q, limit=max(limit, 1))})
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        # sidebar counts for the list's filters; one aggregate query,
+        # cached under the catalog version like the list itself
+        return self.cached_response(self.compute_facets, request)
+
+    def compute_facets(self, request):
+        return Response(facet_counts(self.filter_queryset(Property.objects.all())))
+
+    @action(detail=False, methods=['get'], url_path=r'export/(?P<fmt>csv|ndjson)')
+    def export(self, request, fmt=None):
+        # same filters as the list; ?since=/?until= on date_posted
+        queryset = self.filter_queryset(Property.objects.all())
+        queryset = filter_range(queryset, request.query_params, "date_posted").order_by("date_posted", "id")
+        return stream_export(request, queryset, PROPERTY_EXPORT_FIELDS, fmt, "properties")
 
 
 # ----------------------------------------
@@ -64,44 +172,34 @@ class PropertyImageViewSet(viewsets.ModelViewSet):
         return [IsSuperUser()]
 
     def create(self, request, *args, **kwargs):
-        print("------- PROPERTY IMAGE UPLOAD START -------")
-        print("DATA:", request.data)
-        print("FILES:", request.FILES)
-
         property_id = request.data.get("property")
         files = request.FILES.getlist("images")
 
-        print("PROPERTY ID:", property_id)
-        print("FILES COUNT:", len(files))
-
         if not property_id:
             return Response({"error": "property is required"}, status=400)
         if not files:
             return Response({"error": "No images provided"}, status=400)
 
-        created = []
+        prop = Property.objects.filter(pk=property_id).first() if str(property_id).isdigit() else None
+        if prop is None:
+            return Response({"property": [f'Invalid pk "{property_id}" - object does not exist.']}, status=400)
 
-        for file in files:
-            serializer = PropertyImageSerializer(
-                data={"property": property_id, "image": file}
-            )
-            if serializer.is_valid():
-                serializer.save()
-                created.append(serializer.data)
-            else:
-                print("ERROR:", serializer.errors)
-                return Response(serializer.errors, status=400)
+        # validate all, upload in parallel, insert in one statement
+        try:
+            images = upload_property_images(prop, files)
+        except ImageUploadError as e:
+            return Response(e.errors, status=400)
 
-        print("------- PROPERTY IMAGE UPLOAD END -------")
-        return Response(created, status=201)
+        return Response(PropertyImageSerializer(images, many=True).data, status=201)
 
 
 # ----------------------------------------
-# INQUIRY VIEWSET (FINAL ASYNC VERSION)
+# INQUIRY VIEWSET
 # ----------------------------------------
 class InquiryViewSet(viewsets.ModelViewSet):
-    queryset = Inquiry.objects.all().order_by("-created_at")
+    queryset = Inquiry.objects.all().order_by("-created_at", "id")
     serializer_class = InquirySerializer
+    pagination_class = InquiryCursorPagination
 
     def get_permissions(self):
         if self.action == "create":
@@ -109,73 +207,72 @@ class InquiryViewSet(viewsets.ModelViewSet):
         return [IsSuperUser()]
 
     # ------------------------------------
-    # ASYNC EMAIL SENDER
+    # CREATE — notifications go through the outbox
     # ------------------------------------
-    def send_email_async(self, inquiry):
-        try:
-            send_mail(
-                subject=f"New Inquiry from {inquiry.name}",
-                message=(
-                    f"Name: {inquiry.name}\n"
-                    f"Phone: {inquiry.phone}\n"
-                    f"Email: {inquiry.email}\n"
-                    f"Location: {inquiry.location}\n"
-                    f"Message: {inquiry.message}\n"
-                ),
-                from_email=os.environ.get("EMAIL_HOST_USER"),
-                recipient_list=[os.environ.get("ADMIN_NOTIFICATION_EMAIL")],
-                fail_silently=True
-            )
-        except Exception as e:
-            print("EMAIL FAILED:", e)
+    def create(self, request, *args, **kwargs):
+        # repeats and floods are answered before any DB or outbox work
+        admission = get_inquiry_guard().admit(
+            request, request.data.get("phone"), request.data.get("message")
+        )
+        if admission.duplicate:
+            if admission.original is None:
+                return Response({"detail": "This inquiry is already being submitted."},
+                                status=status.HTTP_409_CONFLICT)
+            return Response(admission.original, status=status.HTTP_201_CREATED)
+        if admission.throttled:
+            raise Throttled(wait=admission.wait)
 
-    # ------------------------------------
-    # ASYNC WHATSAPP SENDER
-    # ------------------------------------
-    def send_whatsapp_async(self, inquiry):
         try:
-            TWILIO_SID = os.environ.get("TWILIO_ACCOUNT_SID")
-            TWILIO_TOKEN = os.environ.get("TWILIO_AUTH_TOKEN")
-            TWILIO_WHATSAPP = os.environ.get("TWILIO_WHATSAPP_NUMBER")
-            ADMIN_WHATSAPP = os.environ.get("ADMIN_WHATSAPP")
-
-            message_text = (
-                f"New Inquiry:\n"
-                f"Name: {inquiry.name}\n"
-                f"Phone: {inquiry.phone}\n"
-                f"Email: {inquiry.email}\n"
-                f"Location: {inquiry.location}\n"
-                f"Message: {inquiry.message}"
-            )
-
-            url = f"https://api.twilio.com/2010-04-01/Accounts/{TWILIO_SID}/Messages.json"
-            data = {
-                "From": TWILIO_WHATSAPP,
-                "To": ADMIN_WHATSAPP,
-                "Body": message_text
-            }
-
-            requests.post(url, data=data, auth=(TWILIO_SID, TWILIO_TOKEN))
-        except Exception as e:
-            print("WHATSAPP FAILED:", e)
+            serializer = InquirySerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+
+            # the inquiry and its notifications commit (or roll back) together;
+            # `manage.py process_outbox` delivers them
+            with transaction.atomic():
+                inquiry = serializer.save()
+                enqueue_inquiry_notifications(inquiry)
+
+            admission.remember(serializer.data)
+        finally:
+            admission.release()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     # ------------------------------------
-    # MAIN CREATE VIEW — NON BLOCKING
+    # STREAMING EXPORT (?since=/?until= on created_at)
     # ------------------------------------
-    def create(self, request, *args, **kwargs):
-        print("INQUIRY RECEIVED >>> running create()")
+    @action(detail=False, methods=["get"], url_path=r"export/(?P<fmt>csv|ndjson)")
+    def export(self, request, fmt=None):
+        queryset = filter_range(Inquiry.objects.all(), request.query_params, "created_at")
+        # a backward walk of the (-created_at, id) index
+        queryset = queryset.order_by("created_at", "-id")
+        return stream_export(request, queryset, INQUIRY_EXPORT_FIELDS, fmt, "inquiries")
 
-        serializer = InquirySerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        inquiry = serializer.save()
 
-        print("Validated & Saved to DB")
+# ----------------------------------------
+# DAILY STATS (SUPERUSER)
+# ----------------------------------------
+class StatsViewSet(viewsets.ViewSet):
+    permission_classes = [IsSuperUser]
+
+    def list(self, request):
+        # ?days=1..365 (default 30), read from the daily rollup table
+        try:
+            days = int(request.query_params.get("days", 30))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= 365:
+            raise ValidationError({"days": ["Enter a whole number between 1 and 365."]})
+        return Response(summary(days=days))
 
-        # ASYNC TASKS
-        print("Starting async email + whatsapp...")
-        run_async(self.send_email_async, inquiry)
-        run_async(self.send_whatsapp_async, inquiry)
 
-        print("Response returned instantly, background tasks running...")
+# ----------------------------------------
+# PROMETHEUS METRICS (SUPERUSER)
+# ----------------------------------------
+class MetricsView(APIView):
+    # /metrics: a scraper sends a superuser's Bearer token; a logged-in
+    # admin can open it in the browser
+    authentication_classes = [JWTAuthentication, SessionAuthentication]
+    permission_classes = [IsSuperUser]
 
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    def get(self, request):
+        return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
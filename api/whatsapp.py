@@ -0,0 +1,190 @@
+# api/whatsapp.py
+import asyncio
+import threading
+import time
+
+import aiohttp
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+TWILIO_MESSAGES_URL = "https://api.twilio.com/2010-04-01/Accounts/{sid}/Messages.json"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+def upstream_failed(status):
+    # 5xx and 429 mean Twilio is down or shedding load; any other 4xx is a
+    # bad message (number, template) and says nothing about its health
+    return status is None or status >= 500 or status == 429
+
+
+def message_sid(data):
+    return data.get("sid") if isinstance(data, dict) else None
+
+
+# ----------------------------------------
+# CIRCUIT BREAKER
+# ----------------------------------------
+class CircuitBreaker:
+    # closed -> open after `threshold` consecutive failures; after
+    # `reset_timeout` seconds one trial call is let through (half-open) and
+    # its outcome closes or re-opens the circuit.
+
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.trial_running:
+                raise CircuitOpenError("WhatsApp circuit is open")
+            self.trial_running = True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+# ----------------------------------------
+# POOLED TWILIO CLIENT
+# ----------------------------------------
+class WhatsAppClient:
+    # One keep-alive session per process, shared by every caller.
+
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.NOTIFY_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.breaker = CircuitBreaker(
+            settings.NOTIFY_BREAKER_THRESHOLD, settings.NOTIFY_BREAKER_RESET
+        )
+
+    def send(self, body, to=None, from_=None):
+        self.breaker.before_call()
+        sid = settings.TWILIO_ACCOUNT_SID
+        try:
+            response = self.session.post(
+                TWILIO_MESSAGES_URL.format(sid=sid),
+                data={
+                    "From": from_ or settings.TWILIO_WHATSAPP_NUMBER,
+                    "To": to or settings.ADMIN_WHATSAPP,
+                    "Body": body,
+                },
+                auth=(sid, settings.TWILIO_AUTH_TOKEN),
+                timeout=(settings.NOTIFY_CONNECT_TIMEOUT, settings.NOTIFY_READ_TIMEOUT),
+            )
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if upstream_failed(getattr(e.response, "status_code", None)):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        try:
+            data = response.json()
+        except ValueError:
+            # accepted all the same (2xx); only the sid is lost, and
+            # raising would have the outbox send the message again
+            data = None
+        return message_sid(data)
+
+
+# ----------------------------------------
+# ASYNC TWIN (aiohttp) FOR THE ASGI VIEWS
+# ----------------------------------------
+class AsyncWhatsAppClient:
+    # Same request as WhatsAppClient.send, same circuit breaker. One
+    # aiohttp session per event loop (a session cannot outlive its loop).
+
+    def __init__(self, breaker):
+        self.breaker = breaker
+        self._session = None
+        self._loop = None
+
+    def session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=settings.NOTIFY_POOL_SIZE),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=settings.NOTIFY_CONNECT_TIMEOUT,
+                    sock_read=settings.NOTIFY_READ_TIMEOUT,
+                ),
+            )
+            self._loop = loop
+        return self._session
+
+    async def send(self, body, to=None, from_=None):
+        self.breaker.before_call()
+        sid = settings.TWILIO_ACCOUNT_SID
+        try:
+            async with self.session().post(
+                TWILIO_MESSAGES_URL.format(sid=sid),
+                data={
+                    "From": from_ or settings.TWILIO_WHATSAPP_NUMBER,
+                    "To": to or settings.ADMIN_WHATSAPP,
+                    "Body": body,
+                },
+                auth=aiohttp.BasicAuth(sid, settings.TWILIO_AUTH_TOKEN),
+            ) as response:
+                response.raise_for_status()
+                try:
+                    data = await response.json(content_type=None)
+                except ValueError:
+                    # accepted all the same, as in WhatsAppClient.send
+                    data = None
+        except aiohttp.ClientResponseError as e:
+            if upstream_failed(e.status):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except BaseException:
+            # includes cancellation by a caller's timeout, so a half-open
+            # trial never stays "running"
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return message_sid(data)
+
+
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+
+def get_whatsapp_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = WhatsAppClient()
+    return _client
+
+
+def get_async_whatsapp_client():
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncWhatsAppClient(get_whatsapp_client().breaker)
+    return _async_client
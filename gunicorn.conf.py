@@ -0,0 +1,21 @@
+# gunicorn.conf.py
+# `gunicorn --config gunicorn.conf.py` (see Procfile)
+#
+# SERVER_MODE=wsgi (default): sync workers, realestate_project.wsgi.
+# SERVER_MODE=asgi: uvicorn workers running realestate_project.asgi, so the
+# async views in api/async_views.py do not hold a worker while they wait.
+import os
+
+SERVER_MODE = os.environ.get("SERVER_MODE", "wsgi")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+# gunicorn's own default (1) unless WEB_CONCURRENCY says otherwise; a
+# container often reports the host's cores, not its memory budget
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "realestate_project.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "realestate_project.wsgi:application"
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class RealestateAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'realestate_app'
+
+    def ready(self):
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .metrics import install_sql_timer
+
+        # per-request SQL count/time for RequestMetrics
+        connection_created.connect(install_sql_timer)
+        for connection in connections.all(initialized_only=True):
+            install_sql_timer(connection)
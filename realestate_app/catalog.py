@@ -0,0 +1,55 @@
+# realestate_app/catalog.py
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+CATALOG_VERSION_KEY = "catalog:version"
+
+
+def catalog_cache():
+    return caches[getattr(settings, "CATALOG_CACHE_ALIAS", "default")]
+
+
+# ----------------------------------------
+# CATALOG VERSION COUNTER
+# ----------------------------------------
+# Every cached catalog response is keyed by this number, so invalidating all
+# of them is a single increment. If the key is ever evicted it restarts from
+# the clock rather than 1, so old keys can never be reused.
+
+def catalog_version():
+    cache = catalog_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def _bump():
+    cache = catalog_cache()
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def bump_catalog_version():
+    # Bump now, and again after commit: a reader racing the open transaction
+    # may cache pre-commit rows under the intermediate version.
+    _bump()
+    if not transaction.get_autocommit():
+        transaction.on_commit(_bump)
+
+
+def images_changed(property_ids):
+    # An image add/remove changes the property's representation: recompute
+    # its cover_image/image_count, move its updated_at (ETags) and the
+    # catalog version. Runs inside the caller's transaction. Bulk paths that
+    # skip model signals call this directly.
+    from .models import Property
+
+    Property.objects.filter(pk__in=property_ids).refresh_image_stats()
+    bump_catalog_version()
@@ -0,0 +1,87 @@
+# realestate_app/derivatives.py
+import io
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .catalog import images_changed
+from .models import PropertyImage
+
+# label -> longest edge in px; images are never upscaled
+SIZES = {
+    "thumb": 320,
+    "card": 640,
+    "full": 1600,
+}
+
+# ext -> (Pillow format, save options); no exif= is passed, so EXIF is dropped
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def load_source(image):
+    storage = image.image.storage
+    with storage.open(image.image.name, "rb") as f:
+        src = Image.open(f)
+        src.load()
+    # bake in camera rotation before the orientation tag is stripped
+    src = ImageOps.exif_transpose(src)
+    if src.mode in ("RGBA", "LA", "P"):
+        src = src.convert("RGBA")
+        flat = Image.new("RGB", src.size, "white")
+        flat.paste(src, mask=src.getchannel("A"))
+        src = flat
+    elif src.mode != "RGB":
+        src = src.convert("RGB")
+    return src
+
+
+def variant_name(name, label, ext):
+    # properties/<uuid>.jpg -> properties/variants/<uuid>_card.webp
+    folder, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(folder, "variants", f"{stem}_{label}.{ext}")
+
+
+def generate_derivatives(image):
+    storage = image.image.storage
+    src = load_source(image)
+
+    variants = {}
+    for label, edge in SIZES.items():
+        resized = src.copy()
+        resized.thumbnail((edge, edge), Image.LANCZOS)
+        variant = {"width": resized.width, "height": resized.height}
+        for ext, (fmt, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, fmt, **options)
+            variant[ext] = storage.save(
+                variant_name(image.image.name, label, ext), ContentFile(buffer.getvalue())
+            )
+        variants[label] = variant
+
+    PropertyImage.objects.filter(pk=image.pk).update(
+        width=src.width, height=src.height, variants=variants
+    )
+    image.width, image.height, image.variants = src.width, src.height, variants
+    return variants
+
+
+def run_derivative_job(payload):
+    # outbox handler (channel "image_derivatives")
+    images = list(PropertyImage.objects.filter(pk__in=payload["image_ids"]))
+    for image in images:
+        generate_derivatives(image)
+    if images:
+        images_changed({image.property_id for image in images})
+
+
+def enqueue_derivatives(images):
+    from api.models import OutboxMessage
+
+    ids = [image.pk for image in images]
+    if ids:
+        OutboxMessage.objects.create(channel="image_derivatives", payload={"image_ids": ids})
@@ -0,0 +1,135 @@
+# realestate_app/geo.py
+import math
+
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+# ----------------------------------------
+# GEOHASH GRID (no PostGIS)
+# ----------------------------------------
+# Property.geohash holds a full-precision geohash. A geohash prefix is a
+# grid cell, and every point in a cell sorts between "<prefix>" and
+# "<prefix>zzz...", so "in these cells" is a few index range scans on the
+# plain B-tree. Exact bbox/distance checks then run on the survivors.
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+PRECISION = 12
+EARTH_RADIUS_KM = 6371.0088
+
+# upper bound on cells per query; more cells means tighter pruning but a
+# longer OR of range scans
+MAX_CELLS = 24
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, value = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    # (height in degrees latitude, width in degrees longitude)
+    lng_bits = math.ceil(5 * precision / 2)
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def covering_cells(min_lat, min_lng, max_lat, max_lng):
+    # The finest set of cells (at most MAX_CELLS) covering the box.
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.floor((max_lat + 90) / height) - math.floor((min_lat + 90) / height) + 1
+        cols = math.floor((max_lng + 180) / width) - math.floor((min_lng + 180) / width) + 1
+        if rows * cols <= MAX_CELLS or precision == 1:
+            break
+
+    cells = set()
+    lat = min_lat
+    while True:
+        lng = min_lng
+        while True:
+            cells.add(encode(lat, lng, precision))
+            if lng >= max_lng:
+                break
+            lng = min(lng + width, max_lng)
+        if lat >= max_lat:
+            break
+        lat = min(lat + height, max_lat)
+    return sorted(cells)
+
+
+def cell_ranges(cells):
+    # merge cells that are neighbours in sort order into (low, high) ranges
+    def to_int(cell):
+        return sum(BASE32.index(c) * 32 ** i for i, c in enumerate(reversed(cell)))
+
+    ranges = []
+    for cell in cells:
+        if ranges and to_int(cell) == to_int(ranges[-1][1]) + 1:
+            ranges[-1][1] = cell
+        else:
+            ranges.append([cell, cell])
+    pad = "z" * (PRECISION - len(cells[0])) if cells else ""
+    return [(low, high + pad) for low, high in ranges]
+
+
+def cells_q(min_lat, min_lng, max_lat, max_lng):
+    q = Q()
+    for low, high in cell_ranges(covering_cells(min_lat, min_lng, max_lat, max_lng)):
+        q |= Q(geohash__range=(low, high))
+    return q
+
+
+def radius_bbox(latitude, longitude, radius_km):
+    # (min_lat, min_lng, max_lat, max_lng) enclosing the circle; longitude
+    # is left open when the circle reaches a pole or the antimeridian
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = max(latitude - dlat, -90.0), min(latitude + dlat, 90.0)
+    if min_lat == -90.0 or max_lat == 90.0:
+        return min_lat, -180.0, max_lat, 180.0
+    dlng = math.degrees(radius_km / EARTH_RADIUS_KM / math.cos(math.radians(latitude)))
+    if longitude - dlng < -180.0 or longitude + dlng > 180.0:
+        return min_lat, -180.0, max_lat, 180.0
+    return min_lat, longitude - dlng, max_lat, longitude + dlng
+
+
+def distance_expression(latitude, longitude):
+    # haversine great-circle distance in km, as a SQL expression (Django
+    # provides the trig functions on SQLite too)
+    dlat = Radians(F("latitude")) - math.radians(latitude)
+    dlng = Radians(F("longitude")) - math.radians(longitude)
+    a = (
+        Power(Sin(dlat / 2), 2)
+        + math.cos(math.radians(latitude)) * Cos(Radians(F("latitude"))) * Power(Sin(dlng / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a), output_field=FloatField())
+
+
+def within_bbox(queryset, min_lat, min_lng, max_lat, max_lng):
+    return queryset.filter(
+        cells_q(min_lat, min_lng, max_lat, max_lng),
+        latitude__range=(min_lat, max_lat),
+        longitude__range=(min_lng, max_lng),
+    )
+
+
+def within_radius(queryset, latitude, longitude, radius_km):
+    # cell prune -> bbox -> exact distance; annotates distance_km
+    queryset = within_bbox(queryset, *radius_bbox(latitude, longitude, radius_km))
+    return queryset.annotate(
+        distance_km=distance_expression(latitude, longitude)
+    ).filter(distance_km__lte=radius_km)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from realestate_app.catalog import images_changed
+from realestate_app.derivatives import generate_derivatives
+from realestate_app.models import PropertyImage
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG variants for property images (backfill or repair)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true",
+                            help="Regenerate every image, not just those without variants.")
+        parser.add_argument("--ids", type=int, nargs="+", help="Only these PropertyImage ids.")
+
+    def handle(self, *args, **options):
+        images = PropertyImage.objects.order_by("id")
+        if options["ids"]:
+            images = images.filter(pk__in=options["ids"])
+        elif not options["all"]:
+            images = images.filter(variants={})
+
+        done, failed, properties = 0, 0, set()
+        for image in images.iterator(chunk_size=200):
+            try:
+                generate_derivatives(image)
+                done += 1
+                properties.add(image.property_id)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"image {image.pk}: {type(e).__name__}: {e}")
+
+        if properties:
+            images_changed(properties)
+        self.stdout.write(f"{done} images processed, {failed} failed")
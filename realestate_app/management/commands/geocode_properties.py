@@ -0,0 +1,96 @@
+import csv
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from realestate_app.catalog import bump_catalog_version
+from realestate_app.models import Property
+
+
+def normalise(text):
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+def load_table(path):
+    # CSV with place,latitude,longitude columns; place is matched against
+    # Property.location case- and whitespace-insensitively
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            missing = {"place", "latitude", "longitude"} - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(f"{path} is missing columns: {', '.join(sorted(missing))}.")
+            return {
+                normalise(row["place"]): (float(row["latitude"]), float(row["longitude"]))
+                for row in reader
+                if row["place"].strip()
+            }
+    except OSError as e:
+        raise CommandError(str(e))
+    except ValueError as e:
+        raise CommandError(f"{path}: bad coordinate ({e}).")
+
+
+def candidates(location):
+    # most specific first: the whole string, its trailing parts
+    # ("Sector 21, Gurgaon, Haryana" -> "gurgaon, haryana" -> "haryana"),
+    # then each part on its own
+    parts = [normalise(part) for part in location.split(",") if part.strip()]
+    for i in range(len(parts)):
+        yield ", ".join(parts[i:])
+    yield from parts
+
+
+class Command(BaseCommand):
+    help = "Fill Property latitude/longitude from a local place lookup table (CSV)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("table", help="CSV with place,latitude,longitude columns.")
+        parser.add_argument("--all", action="store_true",
+                            help="Re-geocode listings that already have coordinates.")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report matches only; write nothing.")
+
+    def handle(self, *args, **options):
+        table = load_table(options["table"])
+
+        listings = Property.objects.only("id", "location", "latitude", "longitude").order_by("pk")
+        if not options["all"]:
+            listings = listings.filter(latitude__isnull=True)
+
+        matched, unmatched, last_pk = 0, {}, 0
+        size = max(options["batch_size"], 1)
+        while True:
+            # keyset batches: no cursor held open across the writes
+            batch = list(listings.filter(pk__gt=last_pk)[:size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            now, changed = timezone.now(), []
+            for prop in batch:
+                point = next((table[c] for c in candidates(prop.location) if c in table), None)
+                if point is None:
+                    unmatched[prop.location] = unmatched.get(prop.location, 0) + 1
+                    continue
+                matched += 1
+                prop.latitude, prop.longitude = point
+                prop.sync_geohash()
+                prop.updated_at = now
+                changed.append(prop)
+
+            if changed and not options["dry_run"]:
+                with transaction.atomic():
+                    Property.objects.bulk_update(
+                        changed, ["latitude", "longitude", "geohash", "updated_at"]
+                    )
+
+        if matched and not options["dry_run"]:
+            bump_catalog_version()
+
+        self.stdout.write(f"{matched} listings geocoded, {sum(unmatched.values())} unmatched")
+        for location, count in sorted(unmatched.items(), key=lambda item: -item[1])[:10]:
+            self.stdout.write(f"  {count:>5}  {location}")
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from realestate_app.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily inquiry/listing rollup (DailyStat) from scratch."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{rebuild()} daily counters written")
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from realestate_app.catalog import bump_catalog_version
+from realestate_app.models import Property
+
+
+class Command(BaseCommand):
+    help = "Backfill or repair the denormalised Property.cover_image / image_count."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Only report listings whose stats are out of step.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        # compare in SQL; only drifted rows are rewritten (and get a new ETag)
+        drifted = (
+            Property.objects.with_actual_image_stats()
+            .exclude(image_count=F("actual_image_count"), cover_image=F("actual_cover_image"))
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        ids = list(drifted)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{len(ids)} listings out of step")
+            return
+
+        size = options["batch_size"]
+        for start in range(0, len(ids), size):
+            Property.objects.filter(pk__in=ids[start:start + size]).refresh_image_stats()
+        if ids:
+            bump_catalog_version()
+        self.stdout.write(f"{len(ids)} listings repaired")
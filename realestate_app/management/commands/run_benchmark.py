@@ -0,0 +1,278 @@
+import json
+import logging
+import math
+import platform
+import random
+import re
+import subprocess
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Min
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from api.models import Inquiry
+from realestate_app.models import Property, PropertyImage
+
+SCENARIOS = ["list", "filter", "search", "detail", "landing_page", "public_dashboard"]
+SAMPLE_SIZE = 100
+
+
+def percentile(ordered, p):
+    # nearest-rank percentile of an already sorted list
+    if not ordered:
+        return None
+    return ordered[max(math.ceil(p / 100 * len(ordered)), 1) - 1]
+
+
+def ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextmanager
+def quiet(logger_name):
+    # failing scenarios are counted in the report, not logged per request
+    logger = logging.getLogger(logger_name)
+    level = logger.level
+    logger.setLevel(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure p50/p95/p99 latency and throughput of the catalog read paths "
+        "through the full Django stack, against the configured database "
+        "(DATABASE_URL: SQLite or Postgres). Writes JSON for comparing commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                            help=f"Comma-separated subset of: {', '.join(SCENARIOS)}.")
+        parser.add_argument("--requests", type=int, default=200, help="Timed requests per scenario.")
+        parser.add_argument("--warmup", type=int, default=20, help="Untimed requests per scenario.")
+        parser.add_argument("--concurrency", type=int, default=1, help="Client threads.")
+        parser.add_argument("--cache", action="store_true",
+                            help="Serve from the catalog response cache (default: bypass it).")
+        parser.add_argument("--seed", type=int, default=42, help="Picks the sampled listings and terms.")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+        parser.add_argument("--compare", help="A previous report; fail if any p95 regressed.")
+        parser.add_argument("--threshold", type=float, default=0.2,
+                            help="Allowed p95 slowdown for --compare (0.2 = 20%%).")
+
+    def handle(self, *args, **options):
+        selected = [name.strip() for name in options["scenarios"].split(",") if name.strip()]
+        unknown = sorted(set(selected) - set(SCENARIOS))
+        if unknown:
+            raise CommandError(f"Unknown scenario: {', '.join(unknown)}.")
+        if options["requests"] < 1 or options["concurrency"] < 1 or options["warmup"] < 0:
+            raise CommandError("--requests and --concurrency must be positive, --warmup not negative.")
+
+        self.options = options
+        paths = self.scenario_paths(random.Random(options["seed"]))
+
+        overrides = {
+            # DEBUG keeps a log of every query; not what production pays
+            "DEBUG": False,
+            "SERVER_TIMING": True,
+            # image URLs are built locally instead of through Cloudinary
+            "STORAGES": {
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+                "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+            },
+        }
+        if not options["cache"]:
+            overrides["CACHES"] = {
+                **settings.CACHES,
+                "benchmark": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+            }
+            overrides["CATALOG_CACHE_ALIAS"] = "benchmark"
+
+        with override_settings(**overrides), quiet("django.request"):
+            scenarios = {name: self.run_scenario(paths[name]) for name in selected}
+
+        report = {"meta": self.meta(), "scenarios": scenarios}
+        text = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(text + "\n")
+            self.print_table(scenarios)
+        else:
+            self.stdout.write(text)
+
+        if options["compare"]:
+            self.compare(scenarios, options["compare"], options["threshold"])
+
+    # ------------------------------------
+    # SCENARIOS
+    # ------------------------------------
+    def sample_listings(self, rnd):
+        # random ids between min and max; ORDER BY random() would sort the table
+        bounds = Property.objects.aggregate(low=Min("id"), high=Max("id"))
+        if bounds["low"] is None:
+            raise CommandError("No listings to benchmark; run `manage.py seed_benchmark` first.")
+        candidates = {rnd.randint(bounds["low"], bounds["high"]) for _ in range(SAMPLE_SIZE * 3)}
+        rows = list(
+            Property.objects.filter(pk__in=candidates)
+            .values("id", "location", "latitude", "longitude")
+            .order_by("id")[:SAMPLE_SIZE]
+        )
+        return rows or list(Property.objects.values("id", "location", "latitude", "longitude")[:SAMPLE_SIZE])
+
+    def scenario_paths(self, rnd):
+        rows = self.sample_listings(rnd)
+        rnd.shuffle(rows)
+        # search for the places listings are actually in ("Sector 21, Jaipur" -> "Jaipur")
+        terms = sorted({row["location"].split(",")[-1].strip() for row in rows if row["location"].strip()})
+        located = [row for row in rows if row["latitude"] is not None and row["longitude"] is not None]
+
+        filters = [
+            "?type=Flat&min_bedrooms=2&max_price=8000000",
+            "?type=House,Villa&min_price=5000000",
+            "?available=true&min_price=2000000&max_price=6000000",
+            "?type=Plot&min_plot_area=200",
+        ]
+        filters += [f"?near={row['latitude']},{row['longitude']}&radius_km=10" for row in located[:4]]
+
+        return {
+            "list": ["/api/properties/"],
+            "filter": [f"/api/properties/{query}" for query in filters],
+            "search": [f"/api/properties/?search={quote(term)}" for term in terms] or ["/api/properties/?search=flat"],
+            "detail": [f"/api/properties/{row['id']}/" for row in rows],
+            "landing_page": ["/"],
+            "public_dashboard": ["/app/properties/"],
+        }
+
+    def run_scenario(self, paths):
+        local = threading.local()
+
+        def hit(i):
+            # -> (seconds, error or None, SQL statements)
+            if not hasattr(local, "client"):
+                local.client = Client()
+            start = time.perf_counter()
+            try:
+                response = local.client.get(paths[i % len(paths)])
+            except Exception as e:
+                return None, f"{type(e).__name__}: {e}", 0
+            elapsed = time.perf_counter() - start
+            if response.status_code >= 400:
+                return None, f"HTTP {response.status_code}", 0
+            match = re.search(r'desc="(\d+) queries"', response.get("Server-Timing", ""))
+            return elapsed, None, int(match.group(1)) if match else 0
+
+        result = {"path": paths[0], "variants": len(paths)}
+        warmup = [hit(i) for i in range(self.options["warmup"])]
+        if warmup and all(error for _, error, _ in warmup):
+            # broken, not slow: don't spend the timed requests on it
+            return {**result, "skipped": True, "errors": len(warmup), "error_kinds": dict(
+                Counter(error for _, error, _ in warmup).most_common(5)
+            )}
+
+        requests = self.options["requests"]
+        started = time.perf_counter()
+        if self.options["concurrency"] > 1:
+            with ThreadPoolExecutor(max_workers=self.options["concurrency"]) as pool:
+                outcomes = list(pool.map(hit, range(requests)))
+        else:
+            outcomes = [hit(i) for i in range(requests)]
+        wall = time.perf_counter() - started
+
+        latencies = sorted(elapsed for elapsed, error, _ in outcomes if error is None)
+        errors = Counter(error for _, error, _ in outcomes if error)
+        queries = [count for _, error, count in outcomes if error is None]
+        return {
+            **result,
+            "requests": requests,
+            "ok": len(latencies),
+            "errors": sum(errors.values()),
+            "error_kinds": dict(errors.most_common(5)),
+            "p50_ms": ms(percentile(latencies, 50)),
+            "p95_ms": ms(percentile(latencies, 95)),
+            "p99_ms": ms(percentile(latencies, 99)),
+            "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+            "max_ms": ms(latencies[-1]) if latencies else None,
+            "throughput_rps": round(len(latencies) / wall, 1),
+            "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+        }
+
+    # ------------------------------------
+    # REPORTING
+    # ------------------------------------
+    def meta(self):
+        try:
+            database_version = ".".join(str(part) for part in connection.get_database_version())
+        except Exception:
+            database_version = None
+        return {
+            "commit": git_commit(),
+            "timestamp": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "database_version": database_version,
+            "django": django.get_version(),
+            "python": platform.python_version(),
+            "listings": Property.objects.count(),
+            "photos": PropertyImage.objects.count(),
+            "inquiries": Inquiry.objects.count(),
+            "requests": self.options["requests"],
+            "warmup": self.options["warmup"],
+            "concurrency": self.options["concurrency"],
+            "cache": self.options["cache"],
+        }
+
+    def print_table(self, scenarios):
+        self.stdout.write(f"{'scenario':18} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8} {'errors':>7}")
+        for name, result in scenarios.items():
+            if result.get("skipped"):
+                self.stdout.write(f"{name:18} skipped: {next(iter(result['error_kinds']))}")
+                continue
+            cells = [
+                "-" if result[key] is None else f"{result[key]:.2f}"
+                for key in ("p50_ms", "p95_ms", "p99_ms")
+            ]
+            self.stdout.write(
+                f"{name:18} {cells[0]:>9} {cells[1]:>9} {cells[2]:>9} "
+                f"{result['throughput_rps']:>8} {result['errors']:>7}"
+            )
+
+    def compare(self, scenarios, path, threshold):
+        try:
+            with open(path) as f:
+                baseline = json.load(f).get("scenarios", {})
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+        regressions = []
+        for name, result in scenarios.items():
+            before = baseline.get(name, {}).get("p95_ms")
+            after = result.get("p95_ms")
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            self.stderr.write(f"{name:18} p95 {before:.2f} -> {after:.2f} ms ({change:+.0%})")
+            if change > threshold:
+                regressions.append(name)
+        if regressions:
+            raise CommandError(f"p95 regressed by more than {threshold:.0%}: {', '.join(regressions)}.")
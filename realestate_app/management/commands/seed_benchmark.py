@@ -0,0 +1,234 @@
+import math
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import Inquiry
+from realestate_app import stats
+from realestate_app.catalog import bump_catalog_version
+from realestate_app.models import Property, PropertyImage
+from realestate_app.search import get_search_backend
+
+# city -> (latitude, longitude, price multiplier)
+CITIES = {
+    "Jaipur": (26.9124, 75.7873, 1.0),
+    "Gurgaon": (28.4595, 77.0266, 2.2),
+    "Noida": (28.5355, 77.3910, 1.6),
+    "Delhi": (28.6139, 77.2090, 2.5),
+    "Mumbai": (19.0760, 72.8777, 3.5),
+    "Pune": (18.5204, 73.8567, 1.8),
+    "Bengaluru": (12.9716, 77.5946, 2.4),
+    "Hyderabad": (17.3850, 78.4867, 1.9),
+    "Ahmedabad": (23.0225, 72.5714, 1.3),
+    "Kota": (25.2138, 75.8648, 0.7),
+}
+# bigger markets get more listings and more inquiries
+CITY_WEIGHTS = [6, 10, 7, 9, 10, 7, 9, 7, 5, 2]
+
+# type -> (weight, median price in lakh)
+TYPES = {
+    "Flat": (40, 55),
+    "House": (18, 90),
+    "Villa": (6, 240),
+    "Plot": (16, 45),
+    "Office": (8, 120),
+    "Shop": (8, 60),
+    "Showroom": (4, 180),
+}
+RESIDENTIAL = {"Flat", "House", "Villa"}
+
+FEATURES = [
+    "corner plot", "park facing", "gated society", "24x7 security", "covered parking",
+    "modular kitchen", "near metro", "east facing", "vastu compliant", "power backup",
+    "lift", "club house", "swimming pool", "ready to move", "freehold", "main road",
+]
+NAMES = ["Asha", "Ravi", "Meena", "Arjun", "Priya", "Karan", "Neha", "Vikram", "Sunita", "Rahul"]
+QUESTIONS = [
+    "Is this still available?", "What is the final price?", "Can I visit this weekend?",
+    "Is the price negotiable?", "Please share more photos.", "Is a home loan possible?",
+]
+
+HISTORY_DAYS = 730
+SCALE_LIMIT = 1_000_000
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    # auto_now/auto_now_add would stamp every generated row "now"; the
+    # benchmark wants two years of history (indexes, stats, date filters)
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field, _, _ in saved:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic listings, photos and inquiries for benchmarking "
+        "(see run_benchmark). Use a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--properties", type=int, default=1000,
+                            help=f"Listings to create (up to {SCALE_LIMIT:,}).")
+        parser.add_argument("--images-per-property", type=float, default=3.0,
+                            help="Average photo rows per listing (0 for none).")
+        parser.add_argument("--inquiries", type=int,
+                            help="Inquiries to create; defaults to one per listing.")
+        parser.add_argument("--sold-ratio", type=float, default=0.2)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42,
+                            help="Random seed; the same seed gives the same data.")
+        parser.add_argument("--append", action="store_true",
+                            help="Allow seeding a database that already has listings.")
+
+    def handle(self, *args, **options):
+        count = options["properties"]
+        if not 1 <= count <= SCALE_LIMIT:
+            raise CommandError(f"--properties must be between 1 and {SCALE_LIMIT:,}.")
+        if not 0 <= options["sold_ratio"] <= 1:
+            raise CommandError("--sold-ratio must be between 0 and 1.")
+        if Property.objects.exists() and not options["append"]:
+            raise CommandError("This database already has listings; pass --append to add to them.")
+
+        self.random = random.Random(options["seed"])
+        self.now = timezone.now()
+        self.options = options
+        self.batch_size = max(options["batch_size"], 1)
+        started = time.monotonic()
+
+        property_fields = [Property._meta.get_field(name) for name in ("date_posted", "updated_at")]
+        with explicit_timestamps(*property_fields, Inquiry._meta.get_field("created_at")):
+            images = 0
+            for offset in range(0, count, self.batch_size):
+                images += self.seed_properties(range(offset, min(offset + self.batch_size, count)), count)
+                self.stdout.write(f"  {min(offset + self.batch_size, count):,} listings", ending="\r")
+            self.stdout.write("")
+
+            inquiries = count if options["inquiries"] is None else options["inquiries"]
+            for offset in range(0, inquiries, self.batch_size):
+                self.seed_inquiries(min(self.batch_size, inquiries - offset))
+
+        bump_catalog_version()
+        self.stdout.write(
+            f"{count:,} listings, {images:,} photos, {inquiries:,} inquiries "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+
+    # ------------------------------------
+    # LISTINGS
+    # ------------------------------------
+    def moment(self, days_back):
+        return self.now - timedelta(days=days_back, seconds=self.random.randrange(86400))
+
+    def make_property(self, position, total):
+        rnd = self.random
+        city = rnd.choices(list(CITIES), CITY_WEIGHTS)[0]
+        lat, lng, multiplier = CITIES[city]
+        property_type = rnd.choices(list(TYPES), [w for w, _ in TYPES.values()])[0]
+        median = TYPES[property_type][1] * multiplier * 100_000
+        # prices are roughly log-normal around the type/city median
+        price = round(median * math.exp(rnd.gauss(0, 0.45)), -4)
+        sector = rnd.randint(1, 120)
+        features = rnd.sample(FEATURES, rnd.randint(2, 6))
+
+        prop = Property(
+            title=f"{property_type} in Sector {sector}, {city}",
+            description=f"{property_type} in Sector {sector}, {city} with " + ", ".join(features) + ".",
+            price=price,
+            location=f"Sector {sector}, {city}",
+            property_type=property_type,
+            # ~5 km of scatter around the city centre
+            latitude=round(lat + rnd.gauss(0, 0.045), 6),
+            longitude=round(lng + rnd.gauss(0, 0.045), 6),
+        )
+        if property_type in RESIDENTIAL:
+            prop.bedrooms = rnd.choices([1, 2, 3, 4, 5, 6], [10, 30, 32, 16, 8, 4])[0]
+            prop.bathrooms = max(1, prop.bedrooms - rnd.randint(0, 1))
+        elif property_type == "Plot":
+            prop.plot_area = float(rnd.choice([100, 150, 200, 250, 300, 500, 1000]))
+        else:
+            prop.carpet_area = float(rnd.randint(150, 5000))
+            prop.super_builtup_area = round(prop.carpet_area * rnd.uniform(1.2, 1.4))
+
+        # newer ids are newer listings, as in production
+        prop.date_posted = self.moment(int(HISTORY_DAYS * (total - position - 1) / total))
+        prop.updated_at = prop.date_posted
+        if rnd.random() < self.options["sold_ratio"]:
+            prop.sold_out = True
+            prop.sold_at = min(prop.date_posted + timedelta(days=rnd.randint(1, 180)), self.now)
+            prop.updated_at = prop.sold_at
+        prop.sync_geohash()  # bulk_create skips save()
+        return prop
+
+    def photo_count(self):
+        average = self.options["images_per_property"]
+        if average <= 0:
+            return 0
+        return max(0, min(12, round(self.random.gauss(average, average / 2))))
+
+    def seed_properties(self, positions, total):
+        rnd = self.random
+        props = [self.make_property(position, total) for position in positions]
+        photos = []
+        for prop in props:
+            paths = [f"properties/bench-{rnd.getrandbits(64):016x}.jpg" for _ in range(self.photo_count())]
+            # what catalog.images_changed would have stored
+            prop.cover_image = paths[0] if paths else ""
+            prop.image_count = len(paths)
+            photos.append(paths)
+
+        with transaction.atomic():
+            created = Property.objects.bulk_create(props, batch_size=1000)
+            PropertyImage.objects.bulk_create(
+                [
+                    PropertyImage(property=prop, image=path, width=1600, height=1200)
+                    for prop, paths in zip(created, photos)
+                    for path in paths
+                ],
+                batch_size=1000,
+            )
+            # bulk_create skips the signals: index and count like import_properties
+            get_search_backend().index([prop.pk for prop in created])
+            deltas = Counter()
+            for prop in created:
+                deltas.update(stats.listing_delta(prop.date_posted, prop.sold_at))
+            stats.apply(deltas)
+        return sum(len(paths) for paths in photos)
+
+    # ------------------------------------
+    # INQUIRIES
+    # ------------------------------------
+    def seed_inquiries(self, size):
+        rnd = self.random
+        inquiries = []
+        for _ in range(size):
+            city = rnd.choices(list(CITIES), CITY_WEIGHTS)[0]
+            name = rnd.choice(NAMES)
+            # recent days get more traffic
+            days_back = min(int(rnd.expovariate(1 / 120)), HISTORY_DAYS - 1)
+            inquiries.append(Inquiry(
+                name=f"{name} {rnd.randint(1, 999)}",
+                phone=f"9{rnd.randrange(10 ** 9):09d}",
+                email=f"{name.lower()}{rnd.randint(1, 9999)}@example.com" if rnd.random() < 0.6 else None,
+                location=f"Sector {rnd.randint(1, 120)}, {city}" if rnd.random() < 0.8 else city,
+                message=rnd.choice(QUESTIONS),
+                created_at=self.moment(days_back),
+            ))
+
+        with transaction.atomic():
+            Inquiry.objects.bulk_create(inquiries, batch_size=1000)
+            deltas = Counter()
+            for inquiry in inquiries:
+                deltas.update(stats.inquiry_delta(inquiry.created_at, inquiry.location))
+            stats.apply(deltas)
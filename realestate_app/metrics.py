@@ -0,0 +1,190 @@
+# realestate_app/metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# ----------------------------------------
+# IN-PROCESS METRICS
+# ----------------------------------------
+# Fixed-bucket histograms and counters kept in memory and rendered in the
+# Prometheus text format at /metrics. Recording costs a lock, a bisect and
+# a few additions; nothing is formatted until a scrape. Each gunicorn
+# worker keeps its own numbers (a scrape sees the worker that served it),
+# so scrape per worker or sum across scrapes.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def escape(value):
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def format_labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in pairs) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.lock = threading.Lock()
+        self.series = {}  # ((label, value), ...) -> total
+
+    def inc(self, labels, amount=1):
+        with self.lock:
+            self.series[labels] = self.series.get(labels, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            series = dict(self.series)
+        for labels, total in sorted(series.items()):
+            yield f"{self.name}{format_labels(labels)} {total}"
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+
+
+class Histogram(Counter):
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = buckets
+
+    def observe(self, labels, value):
+        # per-bucket (not cumulative) counts; the last slot is +Inf
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        with self.lock:
+            series = {labels: (list(counts), total) for labels, (counts, total) in self.series.items()}
+        for labels, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{format_labels(labels, [('le', bound)])} {cumulative}"
+            yield f"{self.name}_sum{format_labels(labels)} {total}"
+            yield f"{self.name}_count{format_labels(labels)} {cumulative}"
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time from the first middleware to the response, by view."
+)
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed while serving requests, by view.")
+DB_SECONDS = Counter("db_query_seconds_total", "Time spent in SQL while serving requests, by view.")
+NOTIFY_SECONDS = Histogram(
+    "notification_duration_seconds", "Outbound notification calls (Twilio, SMTP), by channel."
+)
+
+REGISTRY = [REQUEST_SECONDS, DB_QUERIES, DB_SECONDS, NOTIFY_SECONDS]
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    for metric in REGISTRY:
+        metric.reset()
+
+
+# ----------------------------------------
+# PER-REQUEST TIMINGS
+# ----------------------------------------
+# A context variable, so sync_to_async threads and async tasks spawned by
+# a request add to that request's totals.
+
+class RequestTimings:
+    __slots__ = ("started", "queries", "db", "notify")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.notify = 0.0
+
+    def server_timing(self, elapsed):
+        # durations in milliseconds; notify is summed across concurrent sends
+        header = f'app;dur={elapsed * 1000:.2f}, db;dur={self.db * 1000:.2f};desc="{self.queries} queries"'
+        if self.notify:
+            header += f", notify;dur={self.notify * 1000:.2f}"
+        return header
+
+
+current = ContextVar("request_timings", default=None)
+
+
+def start_request():
+    timings = RequestTimings()
+    return timings, current.set(timings)
+
+
+def finish_request(request, response, timings, token):
+    current.reset(token)
+    elapsed = time.perf_counter() - timings.started
+    match = request.resolver_match
+    view = match.view_name if match else "unmatched"
+    method = request.method if request.method in METHODS else "other"
+    status = f"{response.status_code // 100}xx"
+
+    REQUEST_SECONDS.observe((("view", view), ("method", method), ("status", status)), elapsed)
+    if timings.queries:
+        labels = (("view", view),)
+        DB_QUERIES.inc(labels, timings.queries)
+        DB_SECONDS.inc(labels, timings.db)
+    return elapsed
+
+
+def sql_timer(execute, sql, params, many, context):
+    # installed on every connection (apps.py); a no-op outside requests
+    timings = current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db += time.perf_counter() - start
+
+
+def install_sql_timer(connection, **kwargs):
+    # outermost, so connection.execute_wrapper() blocks (which pop the
+    # last wrapper on exit) never remove it
+    if sql_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, sql_timer)
+
+
+@contextmanager
+def notification(channel):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        NOTIFY_SECONDS.observe((("channel", channel),), elapsed)
+        timings = current.get()
+        if timings is not None:
+            timings.notify += elapsed
@@ -1,35 +1,88 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
 from django.contrib.auth import logout
 import datetime
 
+from . import metrics
+
+
+class RequestMetrics:
+    # Latency per view, SQL count/time and notification time for every
+    # request: aggregated for /metrics and sent back as Server-Timing.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token = metrics.start_request()
+        response = self.get_response(request)
+        return self.finish(request, response, timings, token)
+
+    async def __acall__(self, request):
+        timings, token = metrics.start_request()
+        response = await self.get_response(request)
+        return self.finish(request, response, timings, token)
+
+    def finish(self, request, response, timings, token):
+        elapsed = metrics.finish_request(request, response, timings, token)
+        if getattr(settings, "SERVER_TIMING", True):
+            response["Server-Timing"] = timings.server_timing(elapsed)
+        return response
+
 class AutoLogout:
+    # Works under WSGI and ASGI. The async path hops to a thread only for
+    # the session check, and not at all for /api/ (incl. the async views).
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.check(request)
+        return self.get_response(request)
 
-        # 🚫 Skip API paths (public APIs must NOT use AutoLogout)
-        if request.path.startswith("/api/"):
-            return self.get_response(request)
+    async def __acall__(self, request):
+        if not self.skipped(request):
+            # request.user and the session backends are sync-only
+            await sync_to_async(self.check)(request)
+        return await self.get_response(request)
 
+    def skipped(self, request):
+        # 🚫 Skip API paths (public APIs must NOT use AutoLogout)
         # 🚫 Skip static or media paths
-        if request.path.startswith("/static/") or request.path.startswith("/media/"):
-            return self.get_response(request)
+        return request.path.startswith(("/api/", "/static/", "/media/"))
+
+    def check(self, request):
+        if self.skipped(request):
+            return
 
         # If user is not logged in, skip
         if not request.user.is_authenticated:
-            return self.get_response(request)
+            return
 
-        # Existing logic
         current_datetime = datetime.datetime.now()
         last_activity = request.session.get("last_activity")
 
+        elapsed_time = None
         if last_activity:
-            elapsed_time = (current_datetime - datetime.datetime.fromisoformat(last_activity)).seconds
+            elapsed_time = (current_datetime - datetime.datetime.fromisoformat(last_activity)).total_seconds()
             if elapsed_time > settings.SESSION_COOKIE_AGE:
                 logout(request)
-                request.session.flush()
+                return
 
-        request.session["last_activity"] = current_datetime.isoformat()
-
-        return self.get_response(request)
+        # Touching the session costs a write, so the timestamp only moves
+        # once it is AUTO_LOGOUT_GRANULARITY seconds stale
+        granularity = getattr(settings, "AUTO_LOGOUT_GRANULARITY", 60)
+        if elapsed_time is None or not 0 <= elapsed_time < granularity:
+            request.session["last_activity"] = current_datetime.isoformat()
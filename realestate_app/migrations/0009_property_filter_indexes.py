@@ -0,0 +1,29 @@
+# Generated by Django 5.0.2 on 2026-10-18 09:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realestate_app', '0008_rename_area_property_plot_area_property_carpet_area_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['sold_out', 'property_type', 'price'], name='prop_sold_type_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['sold_out', 'price'], name='prop_sold_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['sold_out', 'property_type', 'bedrooms'], name='prop_sold_type_beds_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['sold_out', 'date_posted'], name='prop_sold_posted_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.0.2 on 2026-10-18 10:05
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    """
+    UPDATE realestate_app_property SET search_vector =
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    """,
+    "CREATE INDEX IF NOT EXISTS prop_search_vector_gin ON realestate_app_property USING gin (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS prop_search_vector_gin",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS realestate_app_property_fts
+    USING fts5(title, location, description, tokenize = 'porter unicode61')
+    """,
+    """
+    INSERT INTO realestate_app_property_fts (rowid, title, location, description)
+    SELECT id, title, location, description FROM realestate_app_property
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS realestate_app_property_fts",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realestate_app', '0009_property_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_for_vendor({"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD}),
+            run_for_vendor({"postgresql": POSTGRES_BACKWARD, "sqlite": SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.2 on 2026-10-18 09:49
+
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    Property = apps.get_model('realestate_app', 'Property')
+    Property.objects.update(updated_at=models.F('date_posted'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realestate_app', '0010_property_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.2 on 2026-10-18 10:02
+
+import realestate_app.models
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_image_stats(apps, schema_editor):
+    Property = apps.get_model('realestate_app', 'Property')
+    PropertyImage = apps.get_model('realestate_app', 'PropertyImage')
+    images = PropertyImage.objects.filter(property=models.OuterRef('pk')).order_by()
+    Property.objects.update(
+        image_count=Coalesce(
+            models.Subquery(images.values('property').annotate(n=models.Count('id')).values('n')), 0
+        ),
+        cover_image=Coalesce(
+            models.Subquery(images.order_by('id').values('image')[:1]), models.Value('')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realestate_app', '0012_propertyimage_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='cover_image',
+            field=models.ImageField(blank=True, editable=False, upload_to=realestate_app.models.property_image_upload),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='image_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_image_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.0.2 on 2026-10-18 10:07
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def backfill_sold_at(apps, schema_editor):
+    # best available guess for listings sold before sold_at existed
+    Property = apps.get_model('realestate_app', 'Property')
+    Property.objects.filter(sold_out=True).update(sold_at=models.F('updated_at'))
+
+
+def populate_daily_stats(apps, schema_editor):
+    # same rollup as realestate_app.stats.rebuild(), on historical models
+    Inquiry = apps.get_model('api', 'Inquiry')
+    Property = apps.get_model('realestate_app', 'Property')
+    DailyStat = apps.get_model('realestate_app', 'DailyStat')
+
+    counts = Counter()
+    inquiries = Inquiry.objects.annotate(day=TruncDate('created_at')).values('day', 'location')
+    for row in inquiries.annotate(n=models.Count('id')).order_by():
+        counts[(row['day'], 'inquiries', '')] += row['n']
+        location = ' '.join((row['location'] or '').split()).lower()[:200]
+        if location:
+            counts[(row['day'], 'inquiries_by_location', location)] += row['n']
+    added = Property.objects.annotate(day=TruncDate('date_posted')).values('day')
+    for row in added.annotate(n=models.Count('id')).order_by():
+        counts[(row['day'], 'listings_added', '')] += row['n']
+    sold = Property.objects.filter(sold_at__isnull=False).annotate(day=TruncDate('sold_at')).values('day')
+    for row in sold.annotate(n=models.Count('id')).order_by():
+        counts[(row['day'], 'listings_sold', '')] += row['n']
+
+    DailyStat.objects.bulk_create(
+        [DailyStat(date=d, metric=m, dimension=dim, count=n) for (d, m, dim), n in counts.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realestate_app', '0014_property_location'),
+        ('api', '0005_outbox_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('metric', models.CharField(max_length=40)),
+                ('dimension', models.CharField(blank=True, default='', max_length=200)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='sold_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_sold_at, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailystat',
+            constraint=models.UniqueConstraint(fields=('date', 'metric', 'dimension'), name='dailystat_key'),
+        ),
+        migrations.RunPython(populate_daily_stats, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,14 @@
 # realestate_app/models.py
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.urls import reverse
+from django.utils import timezone
 import uuid
 import os
+from collections import Counter
+
+from .geo import encode as geohash_encode
 
 
 def property_image_upload(instance, filename):
@@ -11,6 +17,141 @@ def property_image_upload(instance, filename):
     return os.path.join("properties", filename)
 
 
+def point_geohash(latitude, longitude):
+    if latitude is None or longitude is None:
+        return ""
+    return geohash_encode(latitude, longitude)
+
+
+def image_stats():
+    # Property.cover_image / image_count as expressions over PropertyImage
+    images = PropertyImage.objects.filter(property=models.OuterRef("pk")).order_by()
+    return {
+        "image_count": Coalesce(
+            models.Subquery(images.values("property").annotate(n=models.Count("id")).values("n")), 0
+        ),
+        "cover_image": Coalesce(
+            models.Subquery(images.order_by("id").values("image")[:1]), models.Value("")
+        ),
+    }
+
+
+class PropertyQuerySet(models.QuerySet):
+
+    def with_images(self):
+        # one batched query for all images instead of one per property
+        return self.prefetch_related(
+            models.Prefetch("images", queryset=PropertyImage.objects.order_by("id"))
+        )
+
+    def with_actual_image_stats(self):
+        # what cover_image / image_count should be, as actual_* annotations
+        return self.annotate(**{f"actual_{name}": expr for name, expr in image_stats().items()})
+
+    def refresh_image_stats(self):
+        # Recompute the denormalised cover_image / image_count in one UPDATE.
+        # The rows are locked first: a concurrent upload to the same listing
+        # then recomputes after we commit, with a snapshot that sees our
+        # images as well as its own.
+        with transaction.atomic():
+            list(self.select_for_update().order_by("pk").values_list("pk", flat=True))
+            return self.update(updated_at=timezone.now(), **image_stats())
+
+    # -------- set-based writes: one statement, no per-row save() --------
+    # .update() skips signals, so each method does what the handlers in
+    # signals.py would have done.
+
+    def set_sold_out(self, sold_out=True):
+        from .catalog import bump_catalog_version
+        from . import stats
+
+        now = timezone.now()
+        with transaction.atomic():
+            if sold_out:
+                changed = self.exclude(sold_out=True).update(sold_out=True, sold_at=now, updated_at=now)
+                stats.apply(Counter({key: n * changed for key, n in stats.sale_delta(now).items()}))
+            else:
+                # un-selling takes each sale back off the day it was counted on
+                rows = list(self.filter(sold_out=True).select_for_update().values_list("pk", "sold_at"))
+                changed = Property.objects.filter(pk__in=[pk for pk, _ in rows]).update(
+                    sold_out=False, sold_at=None, updated_at=now
+                )
+                deltas = Counter()
+                for _, sold_at in rows:
+                    deltas.update(stats.sale_delta(sold_at, -1))
+                stats.apply(deltas)
+        bump_catalog_version()
+        return changed
+
+    def toggle_sold_out(self):
+        from .catalog import bump_catalog_version
+        from . import stats
+
+        now = timezone.now()
+        with transaction.atomic():
+            rows = list(self.select_for_update().values_list("sold_out", "sold_at"))
+            changed = self.update(
+                sold_out=models.Case(
+                    models.When(sold_out=True, then=models.Value(False)),
+                    default=models.Value(True),
+                ),
+                sold_at=models.Case(
+                    models.When(sold_out=True, then=models.Value(None)),
+                    default=models.Value(now),
+                ),
+                updated_at=now,
+            )
+            deltas = Counter()
+            for sold_out, sold_at in rows:
+                deltas.update(stats.sale_delta(sold_at, -1) if sold_out else stats.sale_delta(now))
+            stats.apply(deltas)
+        bump_catalog_version()
+        return changed
+
+    def update_fields(self, **fields):
+        from .catalog import bump_catalog_version
+        from .search import get_search_backend
+        from .suggest import suggest_index
+
+        with transaction.atomic():
+            ids = list(self.values_list("pk", flat=True))
+            if {"latitude", "longitude"} & fields.keys():
+                # the same point for every row, so one geohash serves them all;
+                # a partial change needs each row's other coordinate
+                if fields.keys() >= {"latitude", "longitude"}:
+                    fields["geohash"] = point_geohash(fields["latitude"], fields["longitude"])
+                else:
+                    raise ValueError("latitude and longitude must be updated together.")
+            changed = Property.objects.filter(pk__in=ids).update(updated_at=timezone.now(), **fields)
+            if SEARCHABLE_FIELDS & fields.keys():
+                get_search_backend().index(ids)
+                transaction.on_commit(suggest_index.invalidate)
+        bump_catalog_version()
+        return changed
+
+    def delete_listings(self):
+        # Raw set-based DELETEs: queryset.delete() would load every row to
+        # fire per-object signals. Must cover every table referencing
+        # Property (today only PropertyImage).
+        from .catalog import bump_catalog_version
+        from .search import get_search_backend
+        from .suggest import suggest_index
+        from . import stats
+
+        with transaction.atomic():
+            ids = list(self.values_list("pk", flat=True))
+            stats.apply(stats.listing_counts(Property.objects.filter(pk__in=ids), sign=-1))
+            PropertyImage.objects.filter(property_id__in=ids)._raw_delete(self.db)
+            deleted = Property.objects.filter(pk__in=ids)._raw_delete(self.db)
+            get_search_backend().remove(ids)
+            transaction.on_commit(suggest_index.invalidate)
+        bump_catalog_version()
+        return deleted
+
+
+SEARCHABLE_FIELDS = {"title", "location", "description"}
+
+
 class Property(models.Model):
 
     PROPERTY_TYPES = [
@@ -43,15 +184,98 @@ class Property(models.Model):
     super_builtup_area = models.FloatField(null=True, blank=True)
 
     date_posted = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     sold_out = models.BooleanField(default=False)
+    # set while sold_out; daily stats count the sale on this day
+    sold_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # denormalised from PropertyImage (first image by id, and how many) so a
+    # card renders from this row alone; kept in step by catalog.images_changed
+    cover_image = models.ImageField(upload_to=property_image_upload, blank=True, editable=False)
+    image_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # map position; geohash is derived in save() and indexed for radius/bbox
+    # queries (see geo.py)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, editable=False, db_index=True)
+
+    # Postgres full-text vector (see search.py); SQLite uses an FTS5 side table
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PropertyQuerySet.as_manager()
+
+    class Meta:
+        # sold_out leads: almost every catalog query is "available listings, ..."
+        indexes = [
+            models.Index(fields=["sold_out", "property_type", "price"], name="prop_sold_type_price_idx"),
+            models.Index(fields=["sold_out", "price"], name="prop_sold_price_idx"),
+            models.Index(fields=["sold_out", "property_type", "bedrooms"], name="prop_sold_type_beds_idx"),
+            models.Index(fields=["sold_out", "date_posted"], name="prop_sold_posted_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    def sync_geohash(self):
+        # bulk_create/bulk_update skip save(), so those callers use this too
+        self.geohash = point_geohash(self.latitude, self.longitude)
+
+    def sync_sold_at(self):
+        if not self.sold_out:
+            self.sold_at = None
+        elif self.sold_at is None:
+            self.sold_at = timezone.now()
+
+    def save(self, *args, **kwargs):
+        self.sync_geohash()
+        self.sync_sold_at()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {"latitude", "longitude"} & update_fields:
+                update_fields.add("geohash")
+            if "sold_out" in update_fields:
+                update_fields.add("sold_at")
+            kwargs["update_fields"] = update_fields
+
+        # the stored sold_at, so the stats signal handler can tell a sale
+        # (or its reversal) from an ordinary edit
+        self._previous_sold_at = None
+        if update_fields is not None and "sold_at" not in update_fields:
+            self._previous_sold_at = self.sold_at
+        elif not self._state.adding:
+            self._previous_sold_at = (
+                Property.objects.filter(pk=self.pk).values_list("sold_at", flat=True).first()
+            )
+        super().save(*args, **kwargs)
+
+class DailyStat(models.Model):
+    # per-day counters maintained by stats.py; dimension is "" or e.g. the
+    # normalised inquiry location
+    date = models.DateField()
+    metric = models.CharField(max_length=40)
+    dimension = models.CharField(max_length=200, blank=True, default="")
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["date", "metric", "dimension"], name="dailystat_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.metric} {self.dimension}".rstrip() + f": {self.count}"
+
+
 class PropertyImage(models.Model):
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to=property_image_upload)
 
+    # filled in off the request path by derivatives.py
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    variants = models.JSONField(default=dict, blank=True)
+
     def __str__(self):
         return f"{self.property.title} Image"
 
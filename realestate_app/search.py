@@ -0,0 +1,139 @@
+# realestate_app/search.py
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = "english"
+FTS_TABLE = "realestate_app_property_fts"
+
+
+# ----------------------------------------
+# POSTGRES: tsvector column + GIN index
+# ----------------------------------------
+class PostgresSearchBackend:
+
+    def search_vector(self):
+        return (
+            SearchVector("title", weight="A", config=SEARCH_CONFIG)
+            + SearchVector("location", weight="B", config=SEARCH_CONFIG)
+            + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+        )
+
+    def search(self, queryset, q):
+        query = SearchQuery(q, search_type="websearch", config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F("search_vector"), query)
+        ).order_by("-search_rank", "-id")
+
+    def index(self, ids):
+        from .models import Property
+        Property.objects.filter(pk__in=ids).update(search_vector=self.search_vector())
+
+    def remove(self, ids):
+        # the vector lives on the row itself
+        pass
+
+    def rebuild(self):
+        from .models import Property
+        Property.objects.update(search_vector=self.search_vector())
+
+
+# ----------------------------------------
+# SQLITE: FTS5 side table keyed by property id
+# ----------------------------------------
+class SQLiteSearchBackend:
+
+    def match_expression(self, q):
+        # every term must match, each as a prefix: "sec 21" -> "sec"* "21"*
+        terms = re.findall(r"\w+", q.lower())
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search(self, queryset, q):
+        match = self.match_expression(q)
+        if not match:
+            return queryset.none()
+
+        table = queryset.model._meta.db_table
+        matches = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,))
+        # bm25 is lower-is-better; negate so both backends sort rank descending
+        rank = RawSQL(
+            f"SELECT -bm25({FTS_TABLE}, 10.0, 5.0, 1.0) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id",
+            (match,),
+            output_field=FloatField(),
+        )
+        return queryset.filter(id__in=matches).annotate(
+            search_rank=rank
+        ).order_by("-search_rank", "-id")
+
+    def index(self, ids):
+        ids = list(ids)
+        if not ids:
+            return
+        placeholders = ", ".join(["%s"] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", ids)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, location, description) "
+                f"SELECT id, title, location, description FROM realestate_app_property "
+                f"WHERE id IN ({placeholders})",
+                ids,
+            )
+
+    def remove(self, ids):
+        ids = list(ids)
+        if not ids:
+            return
+        placeholders = ", ".join(["%s"] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", ids)
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, location, description) "
+                f"SELECT id, title, location, description FROM realestate_app_property"
+            )
+
+
+# ----------------------------------------
+# ANY OTHER DATABASE: unranked substring match
+# ----------------------------------------
+class ContainsSearchBackend:
+
+    def search(self, queryset, q):
+        return queryset.filter(
+            Q(title__icontains=q) |
+            Q(location__icontains=q) |
+            Q(description__icontains=q)
+        )
+
+    def index(self, ids):
+        pass
+
+    def remove(self, ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_search_backend():
+    return BACKENDS.get(connection.vendor, ContainsSearchBackend)()
+
+
+def search_properties(queryset, q):
+    q = (q or "").strip()
+    if not q:
+        return queryset
+    return get_search_backend().search(queryset, q)
@@ -0,0 +1,120 @@
+# realestate_app/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from api.models import Inquiry
+
+from . import stats
+from .catalog import bump_catalog_version, images_changed
+from .derivatives import enqueue_derivatives
+from .models import Property, PropertyImage
+from .search import get_search_backend
+from .suggest import suggest_index
+
+
+# ----------------------------------------
+# SEARCH INDEX SYNC
+# ----------------------------------------
+@receiver(post_save, sender=Property)
+def index_property(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    get_search_backend().index([instance.pk])
+
+
+@receiver(post_delete, sender=Property)
+def unindex_property(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
+
+
+# ----------------------------------------
+# AUTOCOMPLETE INDEX SYNC
+# ----------------------------------------
+@receiver(post_save, sender=Property)
+def refresh_suggestions(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # in-memory: only once the row is really there
+    transaction.on_commit(lambda: suggest_index.update(instance))
+
+
+@receiver(post_delete, sender=Property)
+def drop_suggestions(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: suggest_index.discard(pk))
+
+
+# ----------------------------------------
+# RESPONSE CACHE INVALIDATION + ETAGS
+# ----------------------------------------
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def catalog_changed(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+def property_images_changed(sender, instance, raw=False, origin=None, **kwargs):
+    if raw:
+        return
+    # cascading from a Property delete: the listing itself is going away
+    if isinstance(origin, Property) or getattr(origin, "model", None) is Property:
+        return
+    images_changed([instance.property_id])
+
+
+# ----------------------------------------
+# IMAGE DERIVATIVES (single-row creates; uploads.py enqueues its own)
+# ----------------------------------------
+@receiver(post_save, sender=PropertyImage)
+def queue_derivatives(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        enqueue_derivatives([instance])
+
+
+# ----------------------------------------
+# DAILY STATS ROLLUP (set-based paths call stats.apply themselves)
+# ----------------------------------------
+@receiver(post_save, sender=Property)
+def count_listing_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        stats.apply(stats.listing_delta(instance.date_posted, instance.sold_at))
+        return
+    previous = getattr(instance, "_previous_sold_at", None)
+    if previous != instance.sold_at:
+        deltas = stats.sale_delta(previous, -1)
+        deltas.update(stats.sale_delta(instance.sold_at))
+        stats.apply(deltas)
+
+
+@receiver(post_delete, sender=Property)
+def count_listing_deleted(sender, instance, **kwargs):
+    stats.apply(stats.listing_delta(instance.date_posted, instance.sold_at, -1))
+
+
+@receiver(pre_save, sender=Inquiry)
+def remember_inquiry_location(sender, instance, raw=False, **kwargs):
+    # an edit can move the inquiry to another location counter
+    if instance.pk is not None and not raw:
+        instance._stored_location = (
+            Inquiry.objects.filter(pk=instance.pk).values_list("location", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Inquiry)
+def count_inquiry_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    deltas = stats.inquiry_delta(instance.created_at, instance.location)
+    if not created:
+        deltas.update(stats.inquiry_delta(instance.created_at, getattr(instance, "_stored_location", None), -1))
+    stats.apply(deltas)
+
+
+@receiver(post_delete, sender=Inquiry)
+def count_inquiry_deleted(sender, instance, **kwargs):
+    stats.apply(stats.inquiry_delta(instance.created_at, instance.location, -1))
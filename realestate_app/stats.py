@@ -0,0 +1,160 @@
+# realestate_app/stats.py
+from collections import Counter
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# ----------------------------------------
+# DAILY ROLLUP COUNTERS
+# ----------------------------------------
+# DailyStat holds, per day, exactly what a GROUP BY over the current
+# Inquiry/Property rows would return. Writes apply +/- deltas as they
+# happen (signals.py, and the set-based paths that skip signals), so the
+# dashboards read a few hundred rows instead of scanning the history.
+# `manage.py rebuild_stats` recomputes the table from scratch.
+
+INQUIRIES = "inquiries"
+INQUIRIES_BY_LOCATION = "inquiries_by_location"
+LISTINGS_ADDED = "listings_added"
+LISTINGS_SOLD = "listings_sold"  # by the day sold_at falls on
+
+DAILY_METRICS = [INQUIRIES, LISTINGS_ADDED, LISTINGS_SOLD]
+
+
+def day(moment):
+    return timezone.localdate(moment)
+
+
+def location_key(location):
+    return " ".join((location or "").split()).lower()[:200]
+
+
+# -------- deltas: Counter {(date, metric, dimension): n} --------
+# (combine with Counter.update(); `+` would drop the negative entries)
+
+def inquiry_delta(created_at, location, sign=1):
+    deltas = Counter({(day(created_at), INQUIRIES, ""): sign})
+    if location_key(location):
+        deltas[(day(created_at), INQUIRIES_BY_LOCATION, location_key(location))] += sign
+    return deltas
+
+
+def sale_delta(sold_at, sign=1):
+    return Counter({(day(sold_at), LISTINGS_SOLD, ""): sign}) if sold_at else Counter()
+
+
+def listing_delta(date_posted, sold_at, sign=1):
+    deltas = Counter({(day(date_posted), LISTINGS_ADDED, ""): sign})
+    deltas.update(sale_delta(sold_at, sign))
+    return deltas
+
+
+def inquiry_counts(queryset, sign=1):
+    # the same deltas for a whole queryset, grouped in SQL
+    deltas = Counter()
+    rows = (
+        queryset.order_by()
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "location")
+        .annotate(n=Count("id"))
+    )
+    for row in rows:
+        deltas[(row["day"], INQUIRIES, "")] += sign * row["n"]
+        if location_key(row["location"]):
+            deltas[(row["day"], INQUIRIES_BY_LOCATION, location_key(row["location"]))] += sign * row["n"]
+    return deltas
+
+
+def listing_counts(queryset, sign=1):
+    deltas = Counter()
+    queryset = queryset.order_by()
+    for row in queryset.annotate(day=TruncDate("date_posted")).values("day").annotate(n=Count("id")):
+        deltas[(row["day"], LISTINGS_ADDED, "")] += sign * row["n"]
+    sold = queryset.filter(sold_at__isnull=False).annotate(day=TruncDate("sold_at"))
+    for row in sold.values("day").annotate(n=Count("id")):
+        deltas[(row["day"], LISTINGS_SOLD, "")] += sign * row["n"]
+    return deltas
+
+
+def apply(deltas):
+    # one upsert per counter, count = count + delta; concurrent writers
+    # to the same counter serialise on the row, nothing is lost
+    from .models import DailyStat
+
+    rows = [key for key, n in deltas.items() if n]
+    if not rows:
+        return
+    qn = connection.ops.quote_name
+    table = qn(DailyStat._meta.db_table)
+    date, metric, dimension, count = (qn(c) for c in ("date", "metric", "dimension", "count"))
+    sql = (
+        f"INSERT INTO {table} ({date}, {metric}, {dimension}, {count}) VALUES (%s, %s, %s, %s) "
+        f"ON CONFLICT ({date}, {metric}, {dimension}) "
+        f"DO UPDATE SET {count} = {table}.{count} + excluded.{count}"
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            (connection.ops.adapt_datefield_value(d), m, dim, deltas[(d, m, dim)])
+            for d, m, dim in rows
+        ])
+
+
+def rebuild():
+    from api.models import Inquiry
+    from .models import DailyStat, Property
+
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            # writers queue on their counter upsert until we commit; their
+            # rows are not in our GROUP BY, so their deltas still apply after
+            with connection.cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {connection.ops.quote_name(DailyStat._meta.db_table)} IN EXCLUSIVE MODE")
+        deltas = inquiry_counts(Inquiry.objects.all())
+        deltas.update(listing_counts(Property.objects.all()))
+        DailyStat.objects.all().delete()
+        DailyStat.objects.bulk_create(
+            [DailyStat(date=d, metric=m, dimension=dim, count=n) for (d, m, dim), n in deltas.items() if n],
+            batch_size=1000,
+        )
+    return len(deltas)
+
+
+# -------- reads --------
+
+def summary(days=30, top_locations=10):
+    from .models import DailyStat
+
+    today = timezone.localdate()
+    since = today - timedelta(days=days - 1)
+    window = DailyStat.objects.filter(date__gte=since)
+
+    series = {since + timedelta(days=i): dict.fromkeys(DAILY_METRICS, 0) for i in range(days)}
+    for date, metric, count in window.filter(metric__in=DAILY_METRICS).values_list("date", "metric", "count"):
+        if date in series:
+            series[date][metric] = count
+
+    totals = {metric: sum(row[metric] for row in series.values()) for metric in DAILY_METRICS}
+    locations = (
+        window.filter(metric=INQUIRIES_BY_LOCATION)
+        .values("dimension")
+        .annotate(inquiries=Sum("count"))
+        .filter(inquiries__gt=0)
+        .order_by("-inquiries", "dimension")[:top_locations]
+    )
+
+    return {
+        "since": since,
+        "until": today,
+        "totals": totals,
+        # sold in the window / listed in the window
+        "sold_through_rate": (
+            round(totals[LISTINGS_SOLD] / totals[LISTINGS_ADDED], 4) if totals[LISTINGS_ADDED] else None
+        ),
+        "daily": [{"date": date, **counts} for date, counts in series.items()],
+        "top_locations": [
+            {"location": row["dimension"], "inquiries": row["inquiries"]} for row in locations
+        ],
+    }
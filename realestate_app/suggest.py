@@ -0,0 +1,219 @@
+# realestate_app/suggest.py
+import bisect
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text):
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def word_suffixes(norm):
+    # "sector 21 jaipur" -> "sector 21 jaipur", "21 jaipur", "jaipur"
+    # so a query can match from the start of any word
+    words = norm.split(" ")
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+# ----------------------------------------
+# PER-PROCESS PREFIX INDEX OF LOCATIONS + TITLES
+# ----------------------------------------
+class IndexData:
+    # Each distinct (kind, text) is stored once with a reference count of the
+    # listings using it; lookups are a bisect into a sorted list of word
+    # suffixes.
+
+    KINDS = ("location", "title")
+
+    def __init__(self):
+        self.keys = []          # sorted (suffix, kind, norm)
+        self.counts = {}        # (kind, norm) -> listings using it
+        self.display = {}       # (kind, norm) -> original text
+        self.by_property = {}   # pk -> ((kind, norm), ...)
+
+    def add(self, pk, location, title, insort=False):
+        entries = []
+        for kind, text in zip(self.KINDS, (location, title)):
+            norm = normalize(text)
+            if not norm:
+                continue
+            entry = (kind, norm)
+            entries.append(entry)
+            if entry in self.counts:
+                self.counts[entry] += 1
+                continue
+            self.counts[entry] = 1
+            self.display[entry] = text.strip()
+            for suffix in word_suffixes(norm):
+                key = (suffix, kind, norm)
+                if insort:
+                    bisect.insort(self.keys, key)
+                else:
+                    self.keys.append(key)
+        self.by_property[pk] = tuple(entries)
+
+    def discard(self, pk):
+        for entry in self.by_property.pop(pk, ()):
+            self.counts[entry] -= 1
+            if self.counts[entry]:
+                continue
+            del self.counts[entry]
+            del self.display[entry]
+            kind, norm = entry
+            for suffix in word_suffixes(norm):
+                key = (suffix, kind, norm)
+                i = bisect.bisect_left(self.keys, key)
+                if i < len(self.keys) and self.keys[i] == key:
+                    del self.keys[i]
+
+
+class SuggestIndex:
+    # Lookups never touch the database once the index exists. A rebuild
+    # reads the table into fresh structures on a background thread, with
+    # no lock held, while lookups keep using the old ones; the swap at the
+    # end is the only moment they wait. Signal updates arriving during the
+    # rebuild are replayed onto the new structures before the swap.
+
+    def __init__(self):
+        self.lock = threading.Lock()        # guards data and journal
+        self.build_lock = threading.Lock()  # one rebuild at a time
+        self.reset()
+
+    def reset(self):
+        self.data = IndexData()
+        self.built_at = None
+        self.stale = False
+        self.journal = None  # [(pk, location, title) or (pk,)] while rebuilding
+
+    def max_age(self):
+        return getattr(settings, "SUGGEST_INDEX_MAX_AGE", 600)
+
+    # -------- building --------
+    def rows(self):
+        from .models import Property
+
+        return Property.objects.values_list("pk", "location", "title").iterator(chunk_size=2000)
+
+    def build(self):
+        with self.build_lock:
+            self._build()
+
+    def _build(self):
+        # caller holds build_lock
+        with self.lock:
+            self.journal = []
+        try:
+            data = IndexData()
+            for pk, location, title in self.rows():
+                data.add(pk, location, title)
+            data.keys.sort()
+        except BaseException:
+            with self.lock:
+                self.journal = None
+            raise
+        with self.lock:
+            for change in self.journal:
+                data.discard(change[0])
+                if len(change) == 3:
+                    data.add(*change, insort=True)
+            self.data, self.journal = data, None
+            self.built_at = time.monotonic()
+            self.stale = False
+
+    def rebuild_in_background(self):
+        # single flight: if a rebuild is already running, it will do
+        if self.build_lock.locked():
+            return
+        threading.Thread(target=self._background_build, name="suggest-rebuild", daemon=True).start()
+
+    def _background_build(self):
+        from django.db import connections
+
+        try:
+            if self.build_lock.acquire(blocking=False):
+                try:
+                    self._build()
+                finally:
+                    self.build_lock.release()
+        except DatabaseError as e:
+            logger.warning("Suggest index rebuild failed: %s", e)
+        finally:
+            connections.close_all()  # this thread's own connection
+
+    def warm(self):
+        try:
+            self.build()
+        except DatabaseError as e:
+            # e.g. migrations not applied yet; the first lookup retries
+            logger.warning("Suggest index not built at startup: %s", e)
+
+    def invalidate(self):
+        # after set-based writes: rebuilt behind the next lookup
+        self.stale = True
+
+    def ensure_fresh(self):
+        if self.built_at is None:
+            # never built (warm() failed): nothing to serve meanwhile.
+            # Concurrent first lookups queue on build_lock, then find it built.
+            with self.build_lock:
+                if self.built_at is None:
+                    self._build()
+        elif self.stale or time.monotonic() - self.built_at > self.max_age():
+            # signals only reach the process that made the write; a periodic
+            # rebuild picks up changes made by other workers
+            self.rebuild_in_background()
+
+    # -------- incremental updates --------
+    def update(self, prop):
+        with self.lock:
+            if self.journal is not None:
+                self.journal.append((prop.pk, prop.location, prop.title))
+            if self.built_at is not None:
+                self.data.discard(prop.pk)
+                self.data.add(prop.pk, prop.location, prop.title, insort=True)
+
+    def discard(self, pk):
+        with self.lock:
+            if self.journal is not None:
+                self.journal.append((pk,))
+            if self.built_at is not None:
+                self.data.discard(pk)
+
+    # -------- lookups --------
+    def suggest(self, q, limit=8):
+        prefix = normalize(q)
+        if not prefix:
+            return []
+
+        self.ensure_fresh()
+
+        with self.lock:
+            data = self.data
+            seen = set()
+            i = bisect.bisect_left(data.keys, (prefix,))
+            while i < len(data.keys) and len(seen) < limit * 4:
+                suffix, kind, norm = data.keys[i]
+                if not suffix.startswith(prefix):
+                    break
+                seen.add((kind, norm))
+                i += 1
+
+            # whole-text prefix matches first, then locations, then popularity
+            ranked = sorted(
+                seen,
+                key=lambda e: (not e[1].startswith(prefix), e[0] != "location", -data.counts[e], e[1]),
+            )
+            return [
+                {"text": data.display[entry], "kind": entry[0]}
+                for entry in ranked[:limit]
+            ]
+
+
+suggest_index = SuggestIndex()
@@ -1,3 +1,122 @@
-from django.test import TestCase
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.models import Inquiry
+from . import stats
+
+from .models import DailyStat, Property, PropertyImage
+
+
+class BulkPropertyActionTests(TestCase):
+    def setUp(self):
+        admin = get_user_model().objects.create_superuser("admin", "a@example.com", "pass")
+        self.client.force_login(admin)
+        self.ids = [
+            Property.objects.create(title=f"Flat {i}", price=100, location="Jaipur", property_type="Flat").id
+            for i in range(3)
+        ]
+
+    def test_mark_sold_and_delete(self):
+        response = self.client.post("/app/bulk-action/", {"ids": self.ids[:2], "operation": "mark_sold"})
+        self.assertRedirects(response, "/app/admin-dashboard/", fetch_redirect_response=False)
+        self.assertEqual(Property.objects.filter(sold_out=True).count(), 2)
+
+        self.client.post("/app/bulk-action/", {"ids": self.ids[1:], "operation": "delete"})
+        self.assertEqual(list(Property.objects.values_list("id", flat=True)), self.ids[:1])
+
+    def test_malformed_ids_are_dropped(self):
+        ids = [self.ids[0], "99999999999999999999", "-1", "abc"]
+        response = self.client.post("/app/bulk-action/", {"ids": ids, "operation": "mark_sold"})
+        self.assertRedirects(response, "/app/admin-dashboard/", fetch_redirect_response=False)
+        self.assertEqual(list(Property.objects.filter(sold_out=True).values_list("id", flat=True)), self.ids[:1])
+
+        self.client.post("/app/bulk-action/", {"ids": ["99999999999999999999"], "operation": "delete"})
+        self.assertEqual(Property.objects.count(), 3)
+
+    def test_toggle_sold_out(self):
+        self.client.post(f"/app/toggle-sold/{self.ids[0]}/")
+        self.assertTrue(Property.objects.get(id=self.ids[0]).sold_out)
+        self.assertEqual(self.client.post("/app/toggle-sold/999/").status_code, 404)
+
+
+@override_settings(AUTO_LOGOUT_GRANULARITY=60, SESSION_COOKIE_AGE=600)
+class AutoLogoutTests(TestCase):
+    def setUp(self):
+        admin = get_user_model().objects.create_superuser("admin", "a@example.com", "pass")
+        self.client.force_login(admin)
+
+    def browse(self, at):
+        class Frozen(datetime.datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return at
+
+        with mock.patch("realestate_app.middleware.datetime", mock.Mock(datetime=Frozen)):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get("/app/bulk-action/")
+        writes = [q for q in ctx.captured_queries if "django_session" in q["sql"] and "SELECT" not in q["sql"]]
+        return response, len(writes)
+
+    def test_session_written_only_when_timestamp_is_stale(self):
+        start = datetime.datetime(2026, 1, 1, 12, 0, 0)
+        self.assertEqual(self.browse(start)[1], 1)
+        self.assertEqual(self.browse(start + datetime.timedelta(seconds=30))[1], 0)
+        self.assertEqual(self.browse(start + datetime.timedelta(seconds=59))[1], 0)
+        self.assertEqual(self.browse(start + datetime.timedelta(seconds=61))[1], 1)
+        self.assertEqual(self.client.session["last_activity"], "2026-01-01T12:01:01")
+
+    def test_idle_session_is_logged_out(self):
+        start = datetime.datetime(2026, 1, 1, 12, 0, 0)
+        self.browse(start)
+        # a day and a bit later: .seconds alone would have said 10 seconds
+        response, _ = self.browse(start + datetime.timedelta(days=1, seconds=10))
+        self.assertNotIn("_auth_user_id", self.client.session)
+        self.assertEqual(response.status_code, 302)
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_seed_then_run(self):
+        call_command("seed_benchmark", properties=40, inquiries=25, stdout=StringIO())
+        self.assertEqual(Property.objects.count(), 40)
+        self.assertEqual(Inquiry.objects.count(), 25)
+        self.assertEqual(
+            sum(Property.objects.values_list("image_count", flat=True)), PropertyImage.objects.count()
+        )
+        # two years of history, ids in posting order
+        dates = list(Property.objects.order_by("id").values_list("date_posted", flat=True))
+        self.assertEqual(dates, sorted(dates))
+        self.assertLess(dates[0], timezone.now() - datetime.timedelta(days=365))
+        # the rollup matches a rebuild from the rows
+        snapshot = sorted(DailyStat.objects.filter(count__gt=0).values_list("date", "metric", "dimension", "count"))
+        stats.rebuild()
+        self.assertEqual(
+            snapshot, sorted(DailyStat.objects.values_list("date", "metric", "dimension", "count"))
+        )
+
+        output = os.path.join(tempfile.mkdtemp(), "bench.json")
+        call_command("run_benchmark", requests=3, warmup=1, output=output, stdout=StringIO())
+        with open(output) as f:
+            report = json.load(f)
+
+        self.assertEqual(report["meta"]["listings"], 40)
+        for name in ("list", "filter", "search", "detail"):
+            result = report["scenarios"][name]
+            self.assertEqual((result["ok"], result["errors"]), (3, 0), name)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreater(result["queries_per_request"], 0)
+        # no templates ship with the app: reported, not fatal
+        self.assertTrue(report["scenarios"]["landing_page"]["skipped"])
+
+        with self.assertRaises(CommandError):
+            call_command("seed_benchmark", properties=5, stdout=StringIO())
@@ -0,0 +1,97 @@
+# realestate_app/uploads.py
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .catalog import images_changed
+from .derivatives import enqueue_derivatives
+from .models import PropertyImage
+
+logger = logging.getLogger(__name__)
+
+
+class ImageUploadError(Exception):
+    def __init__(self, errors):
+        # {filename: [messages]}
+        self.errors = errors
+        super().__init__("; ".join(f"{name}: {' '.join(msgs)}" for name, msgs in errors.items()))
+
+
+# ----------------------------------------
+# 1. VALIDATE EVERYTHING BEFORE UPLOADING ANYTHING
+# ----------------------------------------
+def validate_images(files):
+    field = forms.ImageField()
+    errors = {}
+    for f in files:
+        try:
+            field.clean(f)  # Pillow verify; rewinds the file afterwards
+        except ValidationError as e:
+            errors[f.name] = e.messages
+    if errors:
+        raise ImageUploadError(errors)
+
+
+# ----------------------------------------
+# 2. PARALLEL UPLOAD, 3. ONE INSERT
+# ----------------------------------------
+def store_files(files, instance):
+    # Push files to storage on a bounded pool. All or nothing: if any
+    # upload fails the ones that made it are deleted again.
+    field = PropertyImage._meta.get_field("image")
+    storage = field.storage
+
+    def save(f):
+        return storage.save(field.generate_filename(instance, f.name), f, max_length=field.max_length)
+
+    workers = max(1, min(len(files), settings.IMAGE_UPLOAD_CONCURRENCY))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(save, f) for f in files]
+
+    names, errors = [], {}
+    for f, future in zip(files, futures):
+        try:
+            names.append(future.result())
+        except Exception as e:
+            errors[f.name] = [f"Upload failed: {e}"]
+
+    if errors:
+        delete_stored(names)
+        raise ImageUploadError(errors)
+    return names
+
+
+def delete_stored(names):
+    storage = PropertyImage._meta.get_field("image").storage
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.exception("Could not clean up uploaded image %s", name)
+
+
+def upload_property_images(prop, files):
+    files = list(files)
+    if not files:
+        return []
+
+    validate_images(files)
+    names = store_files(files, PropertyImage(property=prop))
+
+    try:
+        with transaction.atomic():
+            images = PropertyImage.objects.bulk_create(
+                [PropertyImage(property=prop, image=name) for name in names]
+            )
+            # bulk_create skips post_save
+            images_changed([prop.pk])
+            enqueue_derivatives(images)
+    except Exception:
+        delete_stored(names)
+        raise
+
+    return images
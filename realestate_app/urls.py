@@ -26,6 +26,9 @@ urlpatterns = [
     # Sold Toggle
     path("toggle-sold/<int:property_id>/", views.toggle_sold_out, name="toggle_sold_out"),
 
+    # Bulk actions
+    path("bulk-action/", views.bulk_property_action, name="bulk_property_action"),
+
     # Auth
     path("agent-login/", views.agent_login, name="agent_login"),
     path("logout/", views.agent_logout, name="agent_logout"),
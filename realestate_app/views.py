@@ -1,18 +1,24 @@
+from django.http import Http404
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.db.models import Q
-from django.conf import settings
+from django.db import transaction
 
-from .models import Property, PropertyImage
+from .models import Property
+from api.filters import parse_int
 from api.models import Inquiry
+from api.notifications import enqueue_property_inquiry_notification
+from api.throttling import get_inquiry_guard
 from .forms import PropertyForm, InquiryForm
+from .search import search_properties
+from .stats import summary
+from .uploads import ImageUploadError, upload_property_images
 
 # ============ HOME / LANDING PAGE ============
 
 def landing_page(request):
-    featured_props = Property.objects.filter(sold_out=False)[:6]
+    featured_props = Property.objects.with_images().filter(sold_out=False)[:6]
     return render(request, "realestate_app/landing.html", {
         "featured_props": featured_props
     })
@@ -24,13 +30,10 @@ def public_dashboard(request):
     q = request.GET.get("q")
     price_filter = request.GET.get("price")
 
-    properties = Property.objects.all().order_by("-id")
+    properties = Property.objects.with_images().order_by("-id")
 
     if q:
-        properties = properties.filter(
-            Q(title__icontains=q) |
-            Q(location__icontains=q)
-        )
+        properties = search_properties(properties, q)
 
     if price_filter == "low":
         properties = properties.order_by("price")
@@ -47,16 +50,15 @@ def public_dashboard(request):
 @user_passes_test(lambda u: u.is_superuser)
 def admin_dashboard(request):
     q = request.GET.get("q")
-    properties = Property.objects.all().order_by("-id")
+    properties = Property.objects.with_images().order_by("-id")
 
     if q:
-        properties = properties.filter(
-            Q(title__icontains=q) |
-            Q(location__icontains=q)
-        )
+        properties = search_properties(properties, q)
 
     return render(request, "realestate_app/admin_dashboard.html", {
-        "properties": properties
+        "properties": properties,
+        # last 30 days from the rollup table, not a scan of the history
+        "stats": summary(days=30),
     })
 
 
@@ -69,13 +71,15 @@ def add_property(request):
         images = request.FILES.getlist("images")
 
         if form.is_valid():
-            prop = form.save()
-
-            for img in images:
-                PropertyImage.objects.create(property=prop, image=img)
-
-            messages.success(request, "Property added successfully!")
-            return redirect("admin_dashboard")
+            try:
+                with transaction.atomic():
+                    prop = form.save()
+                    upload_property_images(prop, images)
+            except ImageUploadError as e:
+                form.add_error(None, str(e))
+            else:
+                messages.success(request, "Property added successfully!")
+                return redirect("admin_dashboard")
 
     else:
         form = PropertyForm()
@@ -95,13 +99,15 @@ def edit_property(request, property_id):
         images = request.FILES.getlist("images")
 
         if form.is_valid():
-            form.save()
-
-            for img in images:
-                PropertyImage.objects.create(property=prop, image=img)
-
-            messages.success(request, "Property updated successfully!")
-            return redirect("admin_dashboard")
+            try:
+                with transaction.atomic():
+                    form.save()
+                    upload_property_images(prop, images)
+            except ImageUploadError as e:
+                form.add_error(None, str(e))
+            else:
+                messages.success(request, "Property updated successfully!")
+                return redirect("admin_dashboard")
 
     else:
         form = PropertyForm(instance=prop)
@@ -132,45 +138,92 @@ def delete_property(request, property_id):
 
 @user_passes_test(lambda u: u.is_superuser)
 def toggle_sold_out(request, property_id):
-    prop = get_object_or_404(Property, id=property_id)
-    prop.sold_out = not prop.sold_out
-    prop.save()
+    listing = Property.objects.filter(id=property_id)
+    if not listing.toggle_sold_out():
+        raise Http404
+    title, sold_out = listing.values_list("title", "sold_out").get()
 
-    if prop.sold_out:
-        messages.success(request, f"{prop.title} marked as SOLD OUT.")
+    if sold_out:
+        messages.success(request, f"{title} marked as SOLD OUT.")
     else:
-        messages.success(request, f"{prop.title} marked as AVAILABLE again.")
+        messages.success(request, f"{title} marked as AVAILABLE again.")
 
     return redirect("admin_dashboard")
 
 
-# ============ PROPERTY DETAIL PAGE ============
+# ============ BULK ACTIONS (ADMIN DASHBOARD CHECKBOXES) ============
 
-def property_detail(request, property_id):
-    prop = get_object_or_404(Property, id=property_id)
-    form = InquiryForm()
+@user_passes_test(lambda u: u.is_superuser)
+def bulk_property_action(request):
+    if request.method != "POST":
+        return redirect("admin_dashboard")
 
-    if request.method == "POST":
-        form = InquiryForm(request.POST)
-        if form.is_valid():
-            inquiry = form.save(commit=False)
-            inquiry.property = prop
-            inquiry.save()
+    ids = []
+    for value in request.POST.getlist("ids"):
+        # same bounds as the API's bulk endpoint; anything else is dropped
+        try:
+            pk = parse_int(value)
+        except ValueError:
+            continue
+        if pk >= 1:
+            ids.append(pk)
+    operation = request.POST.get("operation")
+    listings = Property.objects.filter(id__in=ids)
+
+    if not ids:
+        messages.error(request, "Select at least one property.")
+    elif operation == "mark_sold":
+        messages.success(request, f"{listings.set_sold_out(True)} properties marked as SOLD OUT.")
+    elif operation == "mark_available":
+        messages.success(request, f"{listings.set_sold_out(False)} properties marked as AVAILABLE.")
+    elif operation == "delete":
+        messages.success(request, f"{listings.delete_listings()} properties deleted.")
+    else:
+        messages.error(request, "Unknown action.")
+
+    return redirect("admin_dashboard")
+
+
+# ============ PROPERTY DETAIL PAGE ============
+
+def throttled_message(admission):
+    minutes = max(1, round(admission.wait / 60))
+    return f"Too many inquiries. Please try again in {minutes} minute{'s' if minutes > 1 else ''}."
 
-            # WhatsApp
-            try:
-                send_whatsapp_message(
-                    inquiry.name,
-                    inquiry.phone,
-                    prop.title,
-                    prop.location
-                )
-            except:
-                pass
 
+def property_detail(request, property_id):
+    admission = None
+    if request.method == "POST":
+        # a repeat is answered before the listing is even looked up
+        admission = get_inquiry_guard().admit(
+            request, request.POST.get("phone"), request.POST.get("message"),
+            scope=f"property:{property_id}",
+        )
+        if admission.duplicate:
             messages.success(request, "Inquiry submitted successfully!")
             return redirect("property_detail", property_id=property_id)
 
+    try:
+        prop = get_object_or_404(Property, id=property_id)
+        form = InquiryForm()
+
+        if request.method == "POST":
+            form = InquiryForm(request.POST)
+            if admission.throttled:
+                form.add_error(None, throttled_message(admission))
+            elif form.is_valid():
+                # WhatsApp goes out through the outbox worker, not this request
+                with transaction.atomic():
+                    inquiry = form.save()
+                    enqueue_property_inquiry_notification(inquiry, prop)
+
+                admission.remember(True)
+                messages.success(request, "Inquiry submitted successfully!")
+                return redirect("property_detail", property_id=property_id)
+    finally:
+        if admission is not None:
+            admission.release()
+
     return render(request, "realestate_app/property_detail.html", {
         "property": prop,
         "form": form
@@ -181,12 +234,27 @@ def property_detail(request, property_id):
 
 def contact(request):
     if request.method == "POST":
-        form = InquiryForm(request.POST)
-        if form.is_valid():
-            inquiry = form.save()
+        # own scope: the API answers a repeat with the stored inquiry, which
+        # the form never serialises
+        admission = get_inquiry_guard().admit(
+            request, request.POST.get("phone"), request.POST.get("message"), scope="contact"
+        )
+        if admission.duplicate:
             messages.success(request, "Message sent successfully!")
             return redirect("landing")
 
+        try:
+            form = InquiryForm(request.POST)
+            if admission.throttled:
+                form.add_error(None, throttled_message(admission))
+            elif form.is_valid():
+                inquiry = form.save()
+                admission.remember(True)
+                messages.success(request, "Message sent successfully!")
+                return redirect("landing")
+        finally:
+            admission.release()
+
     else:
         form = InquiryForm()
 
@@ -219,19 +287,3 @@ def agent_login(request):
 def agent_logout(request):
     logout(request)
     return redirect("landing")
-
-
-# ============ SEND WHATSAPP MESSAGE (Twilio) ============
-
-from twilio.rest import Client
-
-def send_whatsapp_message(name, phone, property_title, location):
-    client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-
-    message = client.messages.create(
-        from_="whatsapp:+14155238886",
-        body=f"New Inquiry!\nName: {name}\nPhone: {phone}\nProperty: {property_title}\nLocation: {location}",
-        to=f"whatsapp:{settings.AGENT_WHATSAPP_NUMBER}"
-    )
-
-    return message.sid
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'realestate_project.settings')
 
 application = get_asgi_application()
+
+# Build the per-process autocomplete index before the first request.
+from realestate_app.suggest import suggest_index  # noqa: E402
+
+suggest_index.warm()
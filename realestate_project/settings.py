@@ -56,6 +56,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",        # MUST BE FIRST
+    "realestate_app.middleware.RequestMetrics",     # times everything below it
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -104,15 +105,48 @@ WSGI_APPLICATION = 'realestate_project.wsgi.application'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 import dj_database_url
 
+# Falls back to the bundled SQLite file for local runs and tests.
+DATABASE_URL = os.environ.get('DATABASE_URL') or f"sqlite:///{BASE_DIR / 'db.sqlite3'}"
+
 DATABASES = {
     'default': dj_database_url.config(
-        default=os.environ.get('DATABASE_URL'),
+        default=DATABASE_URL,
         conn_max_age=600,
-        ssl_require=True
+        ssl_require=not DATABASE_URL.startswith("sqlite")
     )
 }
 
 
+# Cache
+# Local memory by default (tests, single process); set REDIS_URL in
+# production so every worker shares cached responses and the catalog version.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+    CATALOG_CACHE_ALIAS = "default"
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+        # Per-process memory cannot carry a catalog version bump to the
+        # other workers, which would keep serving stale listings (and 304s)
+        # until the timeout. Without Redis, catalog responses and validators
+        # are not cached; CATALOG_CACHE_LOCAL=True opts a single-process
+        # server back in.
+        "catalog": {
+            "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+        },
+    }
+    CATALOG_CACHE_ALIAS = "default" if os.environ.get("CATALOG_CACHE_LOCAL") == "True" else "catalog"
+
+CATALOG_CACHE_TIMEOUT = int(os.environ.get("CATALOG_CACHE_TIMEOUT", 300))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -165,6 +199,8 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 AGENT_WHATSAPP_NUMBER = os.getenv("AGENT_WHATSAPP_NUMBER")
+TWILIO_WHATSAPP_NUMBER = os.getenv("TWILIO_WHATSAPP_NUMBER", "whatsapp:+14155238886")
+ADMIN_WHATSAPP = os.getenv("ADMIN_WHATSAPP")
 
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
@@ -176,13 +212,45 @@ CLOUDINARY_STORAGE = {
 
 DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
 
+# 🚦 Inquiry throttling + duplicate suppression (api/throttling.py)
+# "local" counts per worker process; "cache" shares buckets through CACHES
+INQUIRY_THROTTLE_BACKEND = os.environ.get(
+    "INQUIRY_THROTTLE_BACKEND", "cache" if os.environ.get("REDIS_URL") else "local"
+)
+INQUIRY_THROTTLE_CACHE_ALIAS = "default"
+# bucket -> (burst size, seconds to refill a full bucket). The "ip" bucket
+# keys on the client address read NUM_PROXIES entries from the end of
+# X-Forwarded-For (REST_FRAMEWORK["NUM_PROXIES"], env NUM_PROXIES): 1 for
+# the Procfile deploy behind the platform router, 0 when gunicorn faces
+# clients directly (REMOTE_ADDR). Too low and every visitor shares the
+# router's bucket; too high and clients can pick their own.
+INQUIRY_THROTTLE_RATES = {
+    "ip": (20, 3600),
+    "phone": (5, 3600),
+}
+# an identical (phone, message) inside this many seconds is answered with
+# the first submission's response
+INQUIRY_DUPLICATE_WINDOW = int(os.environ.get("INQUIRY_DUPLICATE_WINDOW", 600))
+
+# Parallel storage uploads per multi-image request (realestate_app/uploads.py)
+IMAGE_UPLOAD_CONCURRENCY = int(os.environ.get("IMAGE_UPLOAD_CONCURRENCY", 8))
+
 LOGIN_URL = 'agent_login'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'landing'
 # 🕒 Session Settings
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True        # Logout on browser close
 SESSION_COOKIE_AGE = 600                      # 600 seconds = 10 minutes
-SESSION_SAVE_EVERY_REQUEST = True             # Reset timer with every activity
+SESSION_SAVE_EVERY_REQUEST = False            # AutoLogout saves when last_activity moves
+# Reads come from the cache; only with a shared cache, or a logout on one
+# worker would not reach another worker's local memory
+SESSION_ENGINE = (
+    "django.contrib.sessions.backends.cached_db" if os.environ.get("REDIS_URL")
+    else "django.contrib.sessions.backends.db"
+)
+# AutoLogout rewrites last_activity at most this often (seconds); the idle
+# timeout is then effectively SESSION_COOKIE_AGE minus up to this much
+AUTO_LOGOUT_GRANULARITY = int(os.environ.get("AUTO_LOGOUT_GRANULARITY", 60))
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = "smtp.gmail.com"
@@ -195,6 +263,34 @@ DEFAULT_FROM_EMAIL = os.environ.get("EMAIL_HOST_USER")
 
 ADMIN_NOTIFICATION_EMAIL = os.environ.get("ADMIN_NOTIFICATION_EMAIL")
 
+# 📬 Notification outbox (`manage.py process_outbox`)
+OUTBOX_CONCURRENCY = int(os.environ.get("OUTBOX_CONCURRENCY", 4))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_BACKOFF_BASE = 30          # seconds before the first retry, doubled each time
+OUTBOX_BACKOFF_MAX = 3600
+OUTBOX_LEASE_SECONDS = 300        # a claimed message is retried if not settled by then
+# The async inquiry endpoint (api/async_views.py) sends WhatsApp messages
+# itself, within this many seconds, and leaves the rest to the worker
+OUTBOX_FAST_PATH = os.environ.get("OUTBOX_FAST_PATH", "True") == "True"
+OUTBOX_FAST_PATH_TIMEOUT = float(os.environ.get("OUTBOX_FAST_PATH_TIMEOUT", 5))
+
+# ⏱️ Request metrics (realestate_app/metrics.py): /metrics for superusers,
+# plus a Server-Timing header (app/db/notify ms) on every response
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "True") == "True"
+
+# Inquiry emails share one SMTP session (api/mailer.py). With a digest
+# window > 0, inquiries arriving within it are coalesced into one email.
+EMAIL_IDLE_TIMEOUT = 60
+INQUIRY_EMAIL_DIGEST_WINDOW = int(os.environ.get("INQUIRY_EMAIL_DIGEST_WINDOW", 0))
+INQUIRY_EMAIL_DIGEST_MAX = 200
+
+# Shared Twilio client (api/whatsapp.py)
+NOTIFY_CONNECT_TIMEOUT = 3.05
+NOTIFY_READ_TIMEOUT = 10
+NOTIFY_POOL_SIZE = 10
+NOTIFY_BREAKER_THRESHOLD = 5      # consecutive failures before the circuit opens
+NOTIFY_BREAKER_RESET = 30         # seconds before a trial call is allowed
+
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -202,7 +298,9 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny"
-    ]
+    ],
+    # see INQUIRY_THROTTLE_RATES
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 1)),
 }
 
 SIMPLE_JWT = {
@@ -210,3 +308,7 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
+
+# Location/title autocomplete: per-process index, fully rebuilt after this
+# many seconds to pick up writes made by other workers.
+SUGGEST_INDEX_MAX_AGE = int(os.environ.get("SUGGEST_INDEX_MAX_AGE", 600))
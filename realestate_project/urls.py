@@ -3,12 +3,14 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from realestate_app import views
+from api.views import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.landing_page, name='landing'),  # 🏠 Landing page at root URL
     path('app/', include('realestate_app.urls')),
     path("api/", include("api.urls")),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 
 ]
 
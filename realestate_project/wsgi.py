@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'realestate_project.settings')
 
 application = get_wsgi_application()
+
+# Build the per-process autocomplete index before the first request.
+from realestate_app.suggest import suggest_index  # noqa: E402
+
+suggest_index.warm()